@@ -47,6 +47,36 @@ CUSTOM_FIELDS = {
             "fieldtype": "Attach",
             "insert_after": "location",
         },
+        {
+            "fieldname": "ess_client_id",
+            "label": "ESS Client ID",
+            "fieldtype": "Data",
+            "insert_after": "attendance_image",
+            "read_only": 1,
+            "no_copy": 1,
+        },
+    ],
+    "Employee": [
+        {
+            "fieldname": "ess_birth_month_day",
+            "label": "Birth Month Day",
+            "fieldtype": "Int",
+            "insert_after": "date_of_birth",
+            "search_index": 1,
+            "hidden": 1,
+            "read_only": 1,
+            "no_copy": 1,
+        },
+        {
+            "fieldname": "ess_joining_month_day",
+            "label": "Joining Month Day",
+            "fieldtype": "Int",
+            "insert_after": "date_of_joining",
+            "search_index": 1,
+            "hidden": 1,
+            "read_only": 1,
+            "no_copy": 1,
+        },
     ],
     "Item Group": [
         {
@@ -0,0 +1,165 @@
+# Copyright (c) 2026, Nesscale Solutions Private Limited and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_to_date, get_datetime, getdate
+
+# points are stored in append-only chunks, one row per upload and time bucket
+BUCKET_MINUTES = 15
+# polyline precision, 5 decimals is roughly one metre
+COORDINATE_FACTOR = 1e5
+
+
+class EmployeeLocationChunk(Document):
+    def after_insert(self):
+        # new points arrived, the day's summary has to be recomputed
+        key = get_track_summary_cache_key(self.employee, self.date)
+        frappe.cache().delete_value(key)
+        # again after commit, a read in between may have cached it without them
+        frappe.db.after_commit.add(lambda: frappe.cache().delete_value(key))
+
+
+def get_track_summary_cache_key(employee, date):
+    return f"ess_track_summary|{employee}|{getdate(date)}"
+
+
+def on_doctype_update():
+    frappe.db.add_index("Employee Location Chunk", ["employee", "date", "bucket_start"])
+
+
+def encode_number(value):
+    """Encode one signed integer with the polyline character scheme"""
+    value = ~(value << 1) if value < 0 else value << 1
+    encoded = []
+    while value >= 0x20:
+        encoded.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    encoded.append(chr(value + 63))
+    return "".join(encoded)
+
+
+def decode_numbers(encoded):
+    numbers = []
+    index = 0
+    while index < len(encoded):
+        result = shift = 0
+        while True:
+            byte = ord(encoded[index]) - 63
+            index += 1
+            result |= (byte & 0x1F) << shift
+            shift += 5
+            if byte < 0x20:
+                break
+        numbers.append(~(result >> 1) if result & 1 else result >> 1)
+    return numbers
+
+
+def encode_deltas(values):
+    """Delta encode a list of integers, e.g. seconds since bucket start"""
+    previous = 0
+    encoded = []
+    for value in values:
+        encoded.append(encode_number(value - previous))
+        previous = value
+    return "".join(encoded)
+
+
+def decode_deltas(encoded):
+    values = []
+    previous = 0
+    for delta in decode_numbers(encoded):
+        previous += delta
+        values.append(previous)
+    return values
+
+
+def encode_polyline(points):
+    """Encode [(latitude, longitude)] pairs as a Google polyline string"""
+    previous_lat = previous_lng = 0
+    encoded = []
+    for latitude, longitude in points:
+        lat = round(latitude * COORDINATE_FACTOR)
+        lng = round(longitude * COORDINATE_FACTOR)
+        encoded.append(encode_number(lat - previous_lat))
+        encoded.append(encode_number(lng - previous_lng))
+        previous_lat, previous_lng = lat, lng
+    return "".join(encoded)
+
+
+def decode_polyline(encoded):
+    numbers = decode_numbers(encoded)
+    points = []
+    lat = lng = 0
+    for index in range(0, len(numbers) - 1, 2):
+        lat += numbers[index]
+        lng += numbers[index + 1]
+        points.append((lat / COORDINATE_FACTOR, lng / COORDINATE_FACTOR))
+    return points
+
+
+def get_bucket_start(timestamp):
+    return timestamp.replace(
+        minute=timestamp.minute - timestamp.minute % BUCKET_MINUTES,
+        second=0,
+        microsecond=0,
+    )
+
+
+def append_location_points(employee, points, date=None):
+    """
+    Store a batch of [(latitude, longitude, datetime)] points. Every time
+    bucket in the batch becomes one new chunk row, nothing already stored for
+    the day is read or rewritten.
+    """
+    buckets = {}
+    for latitude, longitude, timestamp in sorted(points, key=lambda point: point[2]):
+        buckets.setdefault(get_bucket_start(timestamp), []).append(
+            (latitude, longitude, timestamp)
+        )
+
+    for bucket_start, bucket_points in buckets.items():
+        frappe.get_doc(
+            dict(
+                doctype="Employee Location Chunk",
+                employee=employee,
+                date=getdate(date or bucket_start),
+                bucket_start=bucket_start,
+                point_count=len(bucket_points),
+                encoded_points=encode_polyline(
+                    [(latitude, longitude) for latitude, longitude, _ in bucket_points]
+                ),
+                encoded_times=encode_deltas(
+                    [
+                        int((timestamp - bucket_start).total_seconds())
+                        for _, _, timestamp in bucket_points
+                    ]
+                ),
+            )
+        ).insert(ignore_permissions=True)
+
+
+def get_location_track(employee, date):
+    """Assemble the track of one day from its chunks, ordered by time"""
+    chunks = frappe.get_all(
+        "Employee Location Chunk",
+        filters={"employee": employee, "date": getdate(date)},
+        fields=["bucket_start", "encoded_points", "encoded_times"],
+        order_by="bucket_start asc, creation asc",
+    )
+    track = []
+    for chunk in chunks:
+        bucket_start = get_datetime(chunk.bucket_start)
+        for (latitude, longitude), seconds in zip(
+            decode_polyline(chunk.encoded_points or ""),
+            decode_deltas(chunk.encoded_times or ""),
+        ):
+            track.append(
+                frappe._dict(
+                    latitude=latitude,
+                    longitude=longitude,
+                    time=add_to_date(bucket_start, seconds=seconds),
+                )
+            )
+    track.sort(key=lambda point: point.time)
+    return track
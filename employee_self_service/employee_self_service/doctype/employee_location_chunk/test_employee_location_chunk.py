@@ -0,0 +1,25 @@
+# Copyright (c) 2026, Nesscale Solutions Private Limited and Contributors
+# See license.txt
+
+# import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from employee_self_service.employee_self_service.doctype.employee_location_chunk.employee_location_chunk import (
+	decode_deltas,
+	decode_polyline,
+	encode_deltas,
+	encode_polyline,
+)
+
+
+class TestEmployeeLocationChunk(FrappeTestCase):
+	def test_polyline_round_trip(self):
+		points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+		encoded = encode_polyline(points)
+
+		self.assertEqual(encoded, "_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+		self.assertEqual(decode_polyline(encoded), points)
+
+	def test_delta_round_trip(self):
+		seconds = [0, 60, 120, 899]
+		self.assertEqual(decode_deltas(encode_deltas(seconds)), seconds)
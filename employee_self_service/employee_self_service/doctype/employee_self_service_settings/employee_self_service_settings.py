@@ -3,6 +3,8 @@
 
 # import frappe
 from frappe.model.document import Document
+from employee_self_service.mobile.v1.settings import clear_settings_snapshot
 
 class EmployeeSelfServiceSettings(Document):
-	pass
+	def on_update(self):
+		clear_settings_snapshot(self)
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Nesscale Solutions Private Limited and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on('ESS Attendance Summary', {
+	// refresh: function(frm) {
+
+	// }
+});
@@ -0,0 +1,191 @@
+# Copyright (c) 2026, Nesscale Solutions Private Limited and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_months, flt, get_first_day, get_last_day, getdate, today
+
+SUMMARY_FIELDS = ("present", "absent", "leave", "holiday", "late")
+
+
+class ESSAttendanceSummary(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("ESS Attendance Summary", ["employee", "year", "month"])
+
+
+def get_attendance_summary(employee, date=None):
+    """
+    Summary row of the month of the given date. Months without a row yet are
+    computed without storing them (this runs in GET requests), rows are created
+    by doc events and reconcile_attendance_summary.
+    """
+    date = getdate(date)
+    summary = frappe.db.get_value(
+        "ESS Attendance Summary",
+        {"employee": employee, "year": date.year, "month": date.month},
+        SUMMARY_FIELDS,
+        as_dict=1,
+    )
+    if not summary:
+        summary = compute_attendance_summaries(date.year, date.month, [employee])[
+            employee
+        ]
+    return summary
+
+
+def compute_attendance_summaries(year, month, employees):
+    """present / absent / leave / holiday / late counts of a month, per employee"""
+    first_day = get_first_day(f"{year}-{month}-01")
+    last_day = get_last_day(first_day)
+    summaries = {
+        employee: frappe._dict({field: 0 for field in SUMMARY_FIELDS})
+        for employee in employees
+    }
+
+    for employee, status, late_entry, count in frappe.get_all(
+        "Attendance",
+        filters={
+            "docstatus": 1,
+            "employee": ["in", employees],
+            "attendance_date": ["between", [first_day, last_day]],
+        },
+        fields=["employee", "status", "late_entry", "count(name) as count"],
+        group_by="employee, status, late_entry",
+        as_list=1,
+    ):
+        summary = summaries[employee]
+        # same weights as the Monthly Attendance Sheet summary
+        if status in ("Present", "Work From Home"):
+            summary.present += count
+            if late_entry:
+                summary.late += count
+        elif status == "Half Day":
+            summary.present += flt(count) / 2
+            summary.leave += flt(count) / 2
+        elif status == "On Leave":
+            summary.leave += count
+        elif status == "Absent":
+            summary.absent += count
+
+    holiday_lists = get_holiday_lists(employees)
+    if holiday_lists:
+        holidays = dict(
+            frappe.get_all(
+                "Holiday",
+                filters={
+                    "parent": ["in", list(set(holiday_lists.values()))],
+                    "holiday_date": ["between", [first_day, last_day]],
+                },
+                fields=["parent", "count(name) as count"],
+                group_by="parent",
+                as_list=1,
+            )
+        )
+        for employee, holiday_list in holiday_lists.items():
+            summaries[employee].holiday = holidays.get(holiday_list, 0)
+    return summaries
+
+
+def get_holiday_lists(employees):
+    """Holiday list of every employee, falling back to the company default"""
+    company_holiday_lists = dict(
+        frappe.get_all("Company", fields=["name", "default_holiday_list"], as_list=1)
+    )
+    holiday_lists = {}
+    for employee, holiday_list, company in frappe.get_all(
+        "Employee",
+        filters={"name": ["in", employees]},
+        fields=["name", "holiday_list", "company"],
+        as_list=1,
+    ):
+        holiday_list = holiday_list or company_holiday_lists.get(company)
+        if holiday_list:
+            holiday_lists[employee] = holiday_list
+    return holiday_lists
+
+
+def get_holiday_count(employee, from_date, to_date):
+    """Holidays of the employee from from_date up to, not including, to_date"""
+    holiday_list = get_holiday_lists([employee]).get(employee)
+    if not holiday_list:
+        return 0
+    return frappe.db.count(
+        "Holiday",
+        [
+            ["parent", "=", holiday_list],
+            ["holiday_date", ">=", getdate(from_date)],
+            ["holiday_date", "<", getdate(to_date)],
+        ],
+    )
+
+
+def update_attendance_summary(year, month, employees):
+    summaries = compute_attendance_summaries(year, month, employees)
+    existing = dict(
+        frappe.get_all(
+            "ESS Attendance Summary",
+            filters={"employee": ["in", employees], "year": year, "month": month},
+            fields=["employee", "name"],
+            as_list=1,
+        )
+    )
+    for employee, summary in summaries.items():
+        if existing.get(employee):
+            frappe.db.set_value(
+                "ESS Attendance Summary",
+                existing[employee],
+                summary,
+                update_modified=False,
+            )
+        else:
+            frappe.get_doc(
+                dict(
+                    doctype="ESS Attendance Summary",
+                    employee=employee,
+                    year=year,
+                    month=month,
+                    **summary,
+                )
+            ).insert(ignore_permissions=True)
+    return summaries
+
+
+def get_months(from_date, to_date):
+    months = []
+    date = get_first_day(from_date)
+    while date <= getdate(to_date):
+        months.append((date.year, date.month))
+        date = add_months(date, 1)
+    return months
+
+
+def on_attendance_change(doc, event):
+    """Attendance and Leave Application doc_event"""
+    docs = [doc]
+    doc_before_save = doc.get_doc_before_save()
+    if doc_before_save:
+        docs.append(doc_before_save)
+
+    months = set()
+    for row in docs:
+        if row.doctype == "Attendance" and row.attendance_date:
+            months.update(get_months(row.attendance_date, row.attendance_date))
+        elif row.get("from_date") and row.get("to_date"):
+            months.update(get_months(row.from_date, row.to_date))
+    for year, month in months:
+        update_attendance_summary(year, month, [doc.employee])
+
+
+def reconcile_attendance_summary():
+    """Nightly job: rebuild this and last month for every active employee, which
+    also picks up holiday list changes and edits made without doc events"""
+    employees = frappe.get_all("Employee", filters={"status": "Active"}, pluck="name")
+    if not employees:
+        return
+    current_month = getdate(today())
+    for date in (add_months(current_month, -1), current_month):
+        update_attendance_summary(date.year, date.month, employees)
+    frappe.db.commit()
@@ -0,0 +1,163 @@
+# Copyright (c) 2026, Nesscale Solutions Private Limited and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint
+
+
+class ESSPendingApproval(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("ESS Pending Approval", ["role", "document_modified"])
+    frappe.db.add_index("ESS Pending Approval", ["reference_doctype", "reference_name"])
+
+
+def update_pending_approval(doc, event):
+    """doc_event for every doctype, keeps the approval index in sync with workflow state"""
+    from frappe.model.workflow import get_workflow_name
+
+    if doc.doctype == "ESS Pending Approval" or not get_workflow_name(doc.doctype):
+        return
+    sync_pending_approval(doc, deleted=(event == "on_trash"))
+
+
+def sync_pending_approval(doc, deleted=False):
+    from frappe.model.workflow import get_workflow, is_transition_condition_satisfied
+
+    frappe.db.delete(
+        "ESS Pending Approval",
+        {"reference_doctype": doc.doctype, "reference_name": doc.name},
+    )
+    if deleted or doc.docstatus == 2:
+        return
+
+    workflow = get_workflow(doc.doctype)
+    state = doc.get(workflow.workflow_state_field)
+    roles = {}
+    for transition in workflow.transitions:
+        if transition.state != state:
+            continue
+        if transition.condition and not is_transition_condition_satisfied(
+            transition, doc
+        ):
+            continue
+        roles[transition.allowed] = roles.get(transition.allowed) or cint(
+            transition.allow_self_approval
+        )
+
+    for role, allow_self_approval in roles.items():
+        frappe.get_doc(
+            dict(
+                doctype="ESS Pending Approval",
+                reference_doctype=doc.doctype,
+                reference_name=doc.name,
+                workflow_state=state,
+                role=role,
+                document_owner=doc.owner,
+                allow_self_approval=allow_self_approval,
+                document_modified=doc.modified,
+            )
+        ).insert(ignore_permissions=True)
+
+
+def on_workflow_update(doc, event):
+    if doc.document_type:
+        frappe.enqueue(
+            "employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval.rebuild_pending_approval_index",
+            queue="long",
+            doctype=doc.document_type,
+            enqueue_after_commit=True,
+        )
+
+
+@frappe.whitelist()
+def rebuild_pending_approval(doctype=None):
+    frappe.only_for("System Manager")
+    frappe.enqueue(rebuild_pending_approval_index, queue="long", doctype=doctype)
+
+
+def rebuild_pending_approval_index(doctype=None):
+    """Rebuild the index for one doctype or for every doctype with an active workflow"""
+    if doctype:
+        doctypes = [doctype]
+    else:
+        doctypes = frappe.get_all(
+            "Workflow", filters={"is_active": 1}, pluck="document_type"
+        )
+    for document_type in doctypes:
+        frappe.db.delete("ESS Pending Approval", {"reference_doctype": document_type})
+        if not frappe.db.exists(
+            "Workflow", {"document_type": document_type, "is_active": 1}
+        ):
+            continue
+        for name in frappe.get_all(
+            document_type, filters={"docstatus": ["<", 2]}, pluck="name"
+        ):
+            sync_pending_approval(frappe.get_doc(document_type, name))
+        frappe.db.commit()
+
+
+def get_pending_approval_query(user, document_type=None):
+    """
+    UNION ALL of one query per workflow doctype: the index rows of the user's
+    roles joined to the document, with the read permission conditions get_list
+    would apply to the user. Doctypes the user cannot read are left out.
+    """
+    from frappe.model.db_query import DatabaseQuery
+
+    doctypes = frappe.get_all(
+        "Workflow", filters={"is_active": 1}, pluck="document_type"
+    )
+    if document_type:
+        doctypes = [doctype for doctype in doctypes if doctype == document_type]
+
+    values = {"roles": tuple(frappe.get_roles(user)), "user": user}
+    queries = []
+    for index, doctype in enumerate(sorted(set(doctypes))):
+        try:
+            match_conditions = DatabaseQuery(doctype, user=user).build_match_conditions()
+        except frappe.PermissionError:
+            continue
+        values[f"doctype_{index}"] = doctype
+        queries.append(
+            f"""SELECT approval.reference_name AS name,
+            approval.workflow_state,
+            MAX(approval.document_modified) AS modified,
+            approval.reference_doctype AS doctype
+            FROM `tabESS Pending Approval` approval
+            INNER JOIN `tab{doctype}` ON `tab{doctype}`.name = approval.reference_name
+            WHERE approval.reference_doctype = %(doctype_{index})s
+            AND approval.role IN %(roles)s
+            AND (approval.allow_self_approval = 1 OR approval.document_owner != %(user)s)
+            {"AND (" + match_conditions.replace("%", "%%") + ")" if match_conditions else ""}
+            GROUP BY approval.reference_doctype, approval.reference_name, approval.workflow_state"""
+        )
+    return " UNION ALL ".join(queries), values
+
+
+def get_pending_approvals(user=None, document_type=None, start=0, page_length=10):
+    """One page of the documents pending on the user, newest first"""
+    query, values = get_pending_approval_query(
+        user or frappe.session.user, document_type
+    )
+    if not query:
+        return []
+    return frappe.db.sql(
+        f"""SELECT * FROM ({query}) pending
+        ORDER BY modified DESC, name DESC
+        LIMIT {cint(start)}, {cint(page_length)}""",
+        values,
+        as_dict=1,
+    )
+
+
+def get_pending_approval_count(user=None, document_type=None):
+    query, values = get_pending_approval_query(
+        user or frappe.session.user, document_type
+    )
+    if not query:
+        return 0
+    return frappe.db.sql(f"SELECT COUNT(*) FROM ({query}) pending", values)[0][0]
@@ -0,0 +1,160 @@
+# Copyright (c) 2026, Nesscale Solutions Private Limited and Contributors
+# See license.txt
+
+import frappe
+from frappe.model.workflow import apply_workflow
+from frappe.tests.utils import FrappeTestCase
+
+from employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval import (
+	get_pending_approval_count,
+	get_pending_approvals,
+)
+
+TEST_DOCTYPE = "ESS Approval Test Document"
+
+
+class TestESSPendingApproval(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		make_test_doctype()
+		make_test_workflow()
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+
+	def get_index_states(self, doc):
+		return set(
+			frappe.get_all(
+				"ESS Pending Approval",
+				filters={"reference_doctype": doc.doctype, "reference_name": doc.name},
+				pluck="workflow_state",
+			)
+		)
+
+	def test_index_follows_workflow_state(self):
+		doc = make_test_document()
+		self.assertEqual(self.get_index_states(doc), {"Draft"})
+
+		apply_workflow(doc, "Review")
+		self.assertEqual(self.get_index_states(doc), {"Pending"})
+
+	def test_cancel_removes_index_rows(self):
+		doc = make_test_document()
+		apply_workflow(doc, "Review")
+		doc = apply_workflow(frappe.get_doc(TEST_DOCTYPE, doc.name), "Approve")
+		self.assertEqual(doc.docstatus, 1)
+		self.assertEqual(self.get_index_states(doc), {"Approved"})
+
+		doc = apply_workflow(frappe.get_doc(TEST_DOCTYPE, doc.name), "Cancel")
+		self.assertEqual(doc.docstatus, 2)
+		self.assertEqual(self.get_index_states(doc), set())
+
+	def test_delete_removes_index_rows(self):
+		doc = make_test_document()
+		frappe.delete_doc(TEST_DOCTYPE, doc.name)
+		self.assertEqual(self.get_index_states(doc), set())
+
+	def test_pagination(self):
+		frappe.db.delete(TEST_DOCTYPE)
+		frappe.db.delete("ESS Pending Approval", {"reference_doctype": TEST_DOCTYPE})
+		names = [make_test_document().name for _ in range(5)]
+
+		pages = [
+			get_pending_approvals(document_type=TEST_DOCTYPE, start=start, page_length=2)
+			for start in (0, 2, 4)
+		]
+		self.assertEqual([len(page) for page in pages], [2, 2, 1])
+		rows = [row for page in pages for row in page]
+		self.assertEqual(sorted(row.name for row in rows), sorted(names))
+		self.assertEqual(
+			rows, get_pending_approvals(document_type=TEST_DOCTYPE, page_length=10)
+		)
+		self.assertEqual(get_pending_approval_count(document_type=TEST_DOCTYPE), 5)
+
+	def test_unreadable_doctype_is_left_out(self):
+		make_test_document()
+		user = "ess-pending-approval@example.com"
+		if not frappe.db.exists("User", user):
+			frappe.get_doc(
+				doctype="User", email=user, first_name="Approval", send_welcome_email=0
+			).insert(ignore_permissions=True)
+
+		self.assertEqual(get_pending_approval_count(user=user, document_type=TEST_DOCTYPE), 0)
+		self.assertEqual(get_pending_approvals(user=user, document_type=TEST_DOCTYPE), [])
+
+
+def make_test_document():
+	return frappe.get_doc(doctype=TEST_DOCTYPE, title=frappe.generate_hash(length=8)).insert()
+
+
+def make_test_doctype():
+	if frappe.db.exists("DocType", TEST_DOCTYPE):
+		return
+	frappe.get_doc(
+		{
+			"doctype": "DocType",
+			"name": TEST_DOCTYPE,
+			"module": "Employee Self Service",
+			"custom": 1,
+			"is_submittable": 1,
+			"autoname": "hash",
+			"fields": [{"fieldname": "title", "fieldtype": "Data", "label": "Title"}],
+			"permissions": [
+				{
+					"role": "System Manager",
+					"read": 1,
+					"write": 1,
+					"create": 1,
+					"delete": 1,
+					"submit": 1,
+					"cancel": 1,
+				}
+			],
+		}
+	).insert()
+
+
+def make_test_workflow():
+	if frappe.db.exists("Workflow", "ESS Approval Test"):
+		return
+	for state in ("Draft", "Pending", "Approved", "Cancelled"):
+		if not frappe.db.exists("Workflow State", state):
+			frappe.get_doc(doctype="Workflow State", workflow_state_name=state).insert()
+	for action in ("Review", "Approve", "Cancel"):
+		if not frappe.db.exists("Workflow Action Master", action):
+			frappe.get_doc(
+				doctype="Workflow Action Master", workflow_action_name=action
+			).insert()
+
+	workflow = frappe.new_doc("Workflow")
+	workflow.workflow_name = "ESS Approval Test"
+	workflow.document_type = TEST_DOCTYPE
+	workflow.workflow_state_field = "workflow_state"
+	workflow.is_active = 1
+	workflow.send_email_alert = 0
+	for state, doc_status in (
+		("Draft", 0),
+		("Pending", 0),
+		("Approved", 1),
+		("Cancelled", 2),
+	):
+		workflow.append(
+			"states", dict(state=state, doc_status=doc_status, allow_edit="System Manager")
+		)
+	for state, action, next_state in (
+		("Draft", "Review", "Pending"),
+		("Pending", "Approve", "Approved"),
+		("Approved", "Cancel", "Cancelled"),
+	):
+		workflow.append(
+			"transitions",
+			dict(
+				state=state,
+				action=action,
+				next_state=next_state,
+				allowed="System Manager",
+				allow_self_approval=1,
+			),
+		)
+	workflow.insert(ignore_permissions=True)
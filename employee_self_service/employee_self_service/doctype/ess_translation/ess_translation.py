@@ -3,6 +3,14 @@
 
 # import frappe
 from frappe.model.document import Document
+from employee_self_service.mobile.v1.translation import clear_translation_bundle
 
 class EssTranslation(Document):
-	pass
+	def on_change(self):
+		clear_translation_bundle(self.language)
+		doc_before_save = self.get_doc_before_save()
+		if doc_before_save and doc_before_save.language != self.language:
+			clear_translation_bundle(doc_before_save.language)
+
+	def on_trash(self):
+		clear_translation_bundle(self.language)
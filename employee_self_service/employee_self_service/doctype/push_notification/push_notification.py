@@ -2,77 +2,217 @@
 # For license information, please see license.txt
 
 import frappe
-import pyfcm
+import requests
+import time
 from frappe.model.document import Document
-from pyfcm import FCMNotification
 import json
-import datetime
+from employee_self_service.mobile.v1.settings import get_settings_snapshot
+
+FCM_ENDPOINT = "https://fcm.googleapis.com/fcm/send"
+# FCM legacy API accepts at most 1000 registration ids per multicast request
+FCM_BATCH_SIZE = 1000
+FCM_MAX_RETRIES = 3
+FCM_BACKOFF_SECONDS = 1
+# tokens with these errors will never be delivered again, so they are dropped
+FCM_INVALID_TOKEN_ERRORS = ("NotRegistered", "InvalidRegistration", "MismatchSenderId")
+
+_fcm_session = None
 
 
 class PushNotification(Document):
     def after_insert(self):
-        server_key = frappe.db.get_single_value(
-            "Employee Self Service Settings", "firebase_server_key"
-        )
-        if not server_key:
-            return
-        if self.send_for == "Single User":
-            token = frappe.db.get_value(
-                "Employee Device Info",
-                filters={"user": self.user},
-                fieldname="token",
+        # delivery happens in the background, the inserting request never
+        # waits on FCM
+        if not self.flags.skip_delivery:
+            enqueue_delivery([self.name])
+
+
+def enqueue_delivery(names):
+    frappe.enqueue(
+        "employee_self_service.employee_self_service.doctype.push_notification.push_notification.deliver_push_notifications",
+        queue="short",
+        names=names,
+        enqueue_after_commit=True,
+    )
+
+
+def get_fcm_session():
+    """HTTP session shared by every FCM request of this worker process"""
+    global _fcm_session
+    if _fcm_session is None:
+        _fcm_session = requests.Session()
+    return _fcm_session
+
+
+def get_fcm_endpoint():
+    return frappe.conf.get("ess_fcm_endpoint") or FCM_ENDPOINT
+
+
+def get_server_key():
+    return get_settings_snapshot("Employee Self Service Settings").get(
+        "firebase_server_key"
+    )
+
+
+def send_multicast(
+    server_key, registration_ids, title=None, message=None, notification_type=None
+):
+    """
+    Send one notification to any number of devices, chunked into FCM
+    multicast requests. Returns the aggregated success / failure counts and
+    the tokens FCM reported as invalid.
+    """
+    result = {"success": 0, "failure": 0, "invalid_tokens": [], "errors": []}
+    for index in range(0, len(registration_ids), FCM_BATCH_SIZE):
+        chunk = registration_ids[index : index + FCM_BATCH_SIZE]
+        try:
+            response = post_to_fcm(
+                server_key,
+                {
+                    "registration_ids": chunk,
+                    "notification": {"title": title, "body": message},
+                    "data": {"notification_type": notification_type},
+                    "priority": "high",
+                },
             )
-            if token:
-                self.response = json.dumps(
-                    send_single_notification(
-                        token,
-                        self.title,
-                        self.message,
-                        self.user,
-                        self.notification_type,
-                    )
-                )
-                self.save()
-
-        elif self.send_for == "Multiple User":
-            users = [nu.user for nu in self.users]
-            registration_ids = frappe.db.get_list(
-                "Employee Device Info",
-                filters=[
-                    ["Employee Device Info", "user", "in", users],
-                    ["Employee Device Info", "token", "is", "set"],
-                ],
-                fields=["token"],
+        except Exception as e:
+            result["failure"] += len(chunk)
+            result["errors"].append(str(e))
+            continue
+
+        result["success"] += response.get("success", 0)
+        result["failure"] += response.get("failure", 0)
+        for token, row in zip(chunk, response.get("results") or []):
+            if row.get("error") in FCM_INVALID_TOKEN_ERRORS:
+                result["invalid_tokens"].append(token)
+    return result
+
+
+def post_to_fcm(server_key, payload):
+    """POST one multicast request, retrying with exponential backoff on
+    connection errors and 5xx / 429 responses"""
+    session = get_fcm_session()
+    headers = {
+        "Authorization": f"key={server_key}",
+        "Content-Type": "application/json",
+    }
+    for attempt in range(FCM_MAX_RETRIES + 1):
+        try:
+            response = session.post(
+                get_fcm_endpoint(), json=payload, headers=headers, timeout=10
             )
-            if registration_ids:
-                registration_ids = [token["token"] for token in registration_ids]
-                self.response = json.dumps(
-                    send_multiple_notification(
-                        registration_ids,
-                        users,
-                        self.title,
-                        self.message,
-                        self.notification_type,
-                    )
-                )
-                self.save()
-        elif self.send_for == "All User":
-            registration_ids = frappe.db.get_list(
-                "Employee Device Info",
-                filters=[["Employee Device Info", "token", "is", "set"]],
-                fields=["token"],
+        except requests.RequestException:
+            if attempt == FCM_MAX_RETRIES:
+                raise
+            time.sleep(FCM_BACKOFF_SECONDS * 2**attempt)
+            continue
+
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == FCM_MAX_RETRIES:
+                response.raise_for_status()
+            retry_after = response.headers.get("Retry-After")
+            time.sleep(
+                int(retry_after)
+                if retry_after and retry_after.isdigit()
+                else FCM_BACKOFF_SECONDS * 2**attempt
             )
-            if registration_ids:
-                registration_ids = [token["token"] for token in registration_ids]
-                self.response = json.dumps(
-                    send_multiple_notification(
-                        registration_ids,
-                        self.title,
-                        self.message,
-                        self.notification_type,
-                    )
-                )
-                self.save()
+            continue
+
+        response.raise_for_status()
+        return response.json()
+
+
+def get_registration_ids(notification):
+    filters = [["Employee Device Info", "token", "is", "set"]]
+    if notification.send_for == "Single User":
+        filters.append(["Employee Device Info", "user", "=", notification.user])
+    elif notification.send_for == "Multiple User":
+        users = frappe.get_all(
+            "Notification User", filters={"parent": notification.name}, pluck="user"
+        )
+        filters.append(["Employee Device Info", "user", "in", users])
+    elif notification.send_for != "All User":
+        return []
+    return frappe.get_all("Employee Device Info", filters=filters, pluck="token")
+
+
+def deliver_push_notifications(names):
+    """Background job: send the given Push Notifications and store the delivery
+    status of all of them in one bulk update"""
+    start_time = time.monotonic()
+    notifications = frappe.get_all(
+        "Push Notification",
+        filters={"name": ["in", names]},
+        fields=["name", "title", "message", "send_for", "user", "notification_type"],
+    )
+    server_key = get_server_key()
+
+    updates = {}
+    invalid_tokens = []
+    all_user_tokens = None
+    for notification in notifications:
+        if not server_key:
+            # nothing can be sent, do not leave them Queued
+            updates[notification.name] = {
+                "status": "Failed",
+                "response": json.dumps(
+                    {
+                        "errors": [
+                            "Firebase Server Key is not set in "
+                            "Employee Self Service Settings"
+                        ]
+                    }
+                ),
+            }
+            continue
+        if notification.send_for == "All User":
+            if all_user_tokens is None:
+                all_user_tokens = get_registration_ids(notification)
+            registration_ids = all_user_tokens
+        else:
+            registration_ids = get_registration_ids(notification)
+        if not registration_ids:
+            updates[notification.name] = {"status": "No Devices"}
+            continue
+        result = send_multicast(
+            server_key,
+            registration_ids,
+            notification.title,
+            notification.message,
+            notification.notification_type,
+        )
+        invalid_tokens.extend(result.pop("invalid_tokens"))
+        updates[notification.name] = {
+            "status": get_delivery_status(result),
+            "success_count": result["success"],
+            "failure_count": result["failure"],
+            "response": json.dumps(result),
+        }
+
+    if updates:
+        frappe.db.bulk_update("Push Notification", updates, update_modified=False)
+    if invalid_tokens:
+        frappe.db.set_value(
+            "Employee Device Info",
+            {"token": ["in", invalid_tokens]},
+            "token",
+            None,
+            update_modified=False,
+        )
+    frappe.db.commit()
+    frappe.logger().info(
+        f"Delivered {len(updates)} push notifications to "
+        f"{sum(row.get('success_count', 0) for row in updates.values())} devices "
+        f"in {time.monotonic() - start_time:.2f}s"
+    )
+
+
+def get_delivery_status(result):
+    if not result["failure"]:
+        return "Sent"
+    if result["success"]:
+        return "Partially Sent"
+    return "Failed"
 
 
 @frappe.whitelist()
@@ -83,28 +223,8 @@ def send_single_notification(
     user=None,
     notification_type=None,
 ):
-    server_key = frappe.db.get_single_value(
-        "Employee Self Service Settings", "firebase_server_key"
-    )
-
-    push_service = FCMNotification(api_key=server_key)
-    # push_service = FCMNotification(
-    #     api_key="AAAAPcJ19TQ:APA91bH0IMYIyGdAAhH0SCEoXHr1gS4jjeaZgCsIcjr5uF5adQqiPG-QARbOx6XS4XOB3W3Km65xJUBo1W6jg8uLYcuHKSMcu-U7QurQLuEEOXHAu9eH9eLYg0RDtNOqYwEAIoOwBHqF"
-    # )
-
-    registration_id = registration_id
-    message_title = title
-    message_body = message
-
-    data_message = {
-        "notification_type": notification_type,
-    }
-
-    return push_service.notify_single_device(
-        registration_id=registration_id,
-        message_title=message_title,
-        message_body=message_body,
-        data_message=data_message,
+    return send_multicast(
+        get_server_key(), [registration_id], title, message, notification_type
     )
 
 
@@ -112,23 +232,10 @@ def send_single_notification(
 def send_multiple_notification(
     registration_ids, users=None, title=None, message=None, notification_type=None
 ):
-    server_key = frappe.db.get_single_value(
-        "Employee Self Service Settings", "firebase_server_key"
-    )
-    push_service = FCMNotification(api_key=server_key)
-    # push_service = FCMNotification(
-    #     api_key="AAAAPcJ19TQ:APA91bH0IMYIyGdAAhH0SCEoXHr1gS4jjeaZgCsIcjr5uF5adQqiPG-QARbOx6XS4XOB3W3Km65xJUBo1W6jg8uLYcuHKSMcu-U7QurQLuEEOXHAu9eH9eLYg0RDtNOqYwEAIoOwBHqF"
-    # )
-
-    registration_ids = registration_ids
-    message_title = title
-    message_body = message
-    data_message = {"notification_type": notification_type}
-    return push_service.notify_multiple_devices(
-        registration_ids=registration_ids,
-        message_title=message_title,
-        message_body=message_body,
-        data_message=data_message,
+    if isinstance(registration_ids, str):
+        registration_ids = json.loads(registration_ids)
+    return send_multicast(
+        get_server_key(), registration_ids, title, message, notification_type
     )
 
 
@@ -140,3 +247,18 @@ def create_push_notification(title, message, send_for, notification_type, user=N
     push_notification_doc.user = user
     push_notification_doc.notification_type = notification_type
     push_notification_doc.save(ignore_permissions=True)
+
+
+def create_push_notifications(notifications):
+    """Insert several Push Notifications and deliver all of them with one background job"""
+    names = []
+    for notification in notifications:
+        push_notification_doc = frappe.get_doc(
+            dict(doctype="Push Notification", **notification)
+        )
+        push_notification_doc.flags.skip_delivery = True
+        push_notification_doc.insert(ignore_permissions=True)
+        names.append(push_notification_doc.name)
+    if names:
+        enqueue_delivery(names)
+    return names
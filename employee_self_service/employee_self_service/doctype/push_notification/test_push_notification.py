@@ -1,9 +1,108 @@
 # Copyright (c) 2023, Nesscale Solutions Private Limited and Contributors
 # See license.txt
 
-# import frappe
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from employee_self_service.employee_self_service.doctype.push_notification import (
+	push_notification,
+)
+
+
+class FakeFCMHandler(BaseHTTPRequestHandler):
+	requests = []
+	fail_next = 0
+
+	def do_POST(self):
+		payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+		FakeFCMHandler.requests.append(payload)
+		if FakeFCMHandler.fail_next:
+			FakeFCMHandler.fail_next -= 1
+			self.send_response(503)
+			self.end_headers()
+			return
+
+		results = [
+			{"error": "NotRegistered"} if token.startswith("invalid") else {"message_id": "1"}
+			for token in payload["registration_ids"]
+		]
+		body = json.dumps(
+			{
+				"success": len([row for row in results if "message_id" in row]),
+				"failure": len([row for row in results if "error" in row]),
+				"results": results,
+			}
+		).encode()
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
 
 class TestPushNotification(FrappeTestCase):
-	pass
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.server = HTTPServer(("127.0.0.1", 0), FakeFCMHandler)
+		threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+		frappe.conf.ess_fcm_endpoint = f"http://127.0.0.1:{cls.server.server_port}/fcm/send"
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		frappe.conf.pop("ess_fcm_endpoint", None)
+		super().tearDownClass()
+
+	def setUp(self):
+		FakeFCMHandler.requests = []
+		FakeFCMHandler.fail_next = 0
+
+	def test_multicast_is_chunked(self):
+		tokens = [f"token-{i}" for i in range(2500)] + ["invalid-1"]
+		result = push_notification.send_multicast("key", tokens, "Title", "Message", "event")
+
+		self.assertEqual(len(FakeFCMHandler.requests), 3)
+		self.assertEqual(result["success"], 2500)
+		self.assertEqual(result["failure"], 1)
+		self.assertEqual(result["invalid_tokens"], ["invalid-1"])
+
+	def test_retry_on_server_error(self):
+		FakeFCMHandler.fail_next = 2
+		with patch.object(push_notification, "FCM_BACKOFF_SECONDS", 0):
+			result = push_notification.send_multicast("key", ["token-1"], "Title", "Message")
+
+		self.assertEqual(len(FakeFCMHandler.requests), 3)
+		self.assertEqual(result["success"], 1)
+
+	def test_gives_up_after_max_retries(self):
+		FakeFCMHandler.fail_next = push_notification.FCM_MAX_RETRIES + 1
+		with patch.object(push_notification, "FCM_BACKOFF_SECONDS", 0):
+			result = push_notification.send_multicast("key", ["token-1"], "Title", "Message")
+
+		self.assertEqual(result["success"], 0)
+		self.assertEqual(result["failure"], 1)
+		self.assertTrue(result["errors"])
+
+	def test_fails_without_server_key(self):
+		notification = frappe.get_doc(
+			doctype="Push Notification", title="Title", message="Message", send_for="All User"
+		)
+		notification.flags.skip_delivery = True
+		notification.insert(ignore_permissions=True)
+
+		with patch.object(push_notification, "get_server_key", return_value=None):
+			push_notification.deliver_push_notifications([notification.name])
+
+		self.assertEqual(
+			frappe.db.get_value("Push Notification", notification.name, "status"), "Failed"
+		)
+		self.assertFalse(FakeFCMHandler.requests)
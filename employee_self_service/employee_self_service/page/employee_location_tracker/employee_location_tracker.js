@@ -61,15 +61,25 @@ frappe.pages['employee-location-tracker'].on_page_load = function (wrapper) {
 
 
 
+	// Create Summary Container
+	const summaryDiv = $('<div class="location-summary text-muted"></div>').insertBefore(mapDiv);
+	summaryDiv.css({ margin: '10px 0' });
+
+	let map = null;
+	let flightPath = null;
+	let dwellMarkers = [];
+
 	// Global function to initialize Google Maps
-	window.initMap = function (locations = []) {
+	window.initMap = function (locations = [], summary = null) {
 		if (locations.length > 0) {
-			console.log(locations)
-			console.log({ lat: locations[0].latitude, lng: locations[0].longitude })
-			const map = new google.maps.Map(document.getElementById('map'), {
-				zoom: 10,
-				center: { lat: parseFloat(locations[0].latitude), lng: parseFloat(locations[0].longitude) }
-			});
+			if (!map) {
+				map = new google.maps.Map(document.getElementById('map'), {
+					zoom: 10,
+					center: { lat: parseFloat(locations[0].latitude), lng: parseFloat(locations[0].longitude) }
+				});
+				// the server simplifies the track per zoom level, reload when it changes
+				map.addListener('zoom_changed', frappe.utils.debounce(load_map, 300));
+			}
 			const seq = {
 				repeat: '50px',
 				icon: {
@@ -82,7 +92,10 @@ frappe.pages['employee-location-tracker'].on_page_load = function (wrapper) {
 				},
 			};
 
-			const flightPath = new google.maps.Polyline({
+			if (flightPath) {
+				flightPath.setMap(null);
+			}
+			flightPath = new google.maps.Polyline({
 				path: locations.map(loc => ({ lat: parseFloat(loc.latitude), lng: parseFloat(loc.longitude) })),
 				geodesic: true,
 				zIndex: 1,
@@ -92,9 +105,26 @@ frappe.pages['employee-location-tracker'].on_page_load = function (wrapper) {
 				map: map,
 				icons: [seq],
 			});
+
+			dwellMarkers.forEach(marker => marker.setMap(null));
+			dwellMarkers = ((summary && summary.dwell_clusters) || []).map(stop => new google.maps.Marker({
+				position: { lat: stop.latitude, lng: stop.longitude },
+				title: __('Stopped {0} min', [stop.minutes]),
+				map: map,
+			}));
 		}
 	};
 
+	function render_summary(data) {
+		const summary = data.summary || {};
+		summaryDiv.html(`
+			${__('Distance')}: <b>${summary.total_distance || 0} km</b> &middot;
+			${__('Stops')}: <b>${(summary.dwell_clusters || []).length}</b> &middot;
+			${__('Outside geofence')}: <b>${summary.minutes_outside_geofence || 0} min</b> &middot;
+			${__('Points')}: <b>${data.track.length} / ${data.total_points}</b>
+		`);
+	}
+
 	// Initialize Map with Google Maps API
 	function load_map() {
 		let employee = filters.employee.get_value();
@@ -104,17 +134,18 @@ frappe.pages['employee-location-tracker'].on_page_load = function (wrapper) {
 			return;
 		}
 
-		// Get location data via Frappe API call
+		// Get the simplified track and the daily summary via Frappe API call
 		frappe.call({
-			method: 'employee_self_service.employee_self_service.page.employee_location_tracker.employee_location_tracker.get_employee_location',
+			method: 'employee_self_service.employee_self_service.page.employee_location_tracker.employee_location_tracker.get_employee_track',
 			args: {
 				employee: employee,
-				date: date
+				date: date,
+				zoom: map ? map.getZoom() : 10
 			},
 			callback: function (r) {
 				if (r.message) {
-					const locations = r.message;
-					initMap(locations);
+					render_summary(r.message);
+					initMap(r.message.track, r.message.summary);
 				}
 			}
 		});
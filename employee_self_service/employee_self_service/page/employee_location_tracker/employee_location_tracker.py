@@ -1,11 +1,168 @@
 import frappe
+import numpy as np
+from frappe.utils import cint, flt, get_datetime, getdate
+from employee_self_service.employee_self_service.doctype.employee_location_chunk.employee_location_chunk import (
+    get_location_track,
+    get_track_summary_cache_key,
+)
+from employee_self_service.mobile.v1.geofence import get_geofences, haversine
+
+# a stop is at least this long and stays within this radius
+DWELL_MINUTES = 10
+DWELL_RADIUS_METERS = 100
+# simplification tolerance in screen pixels, converted to metres per zoom level
+TOLERANCE_PIXELS = 2
+DEFAULT_ZOOM = 10
 
 
 @frappe.whitelist()
 def get_employee_location(employee, date):
-    location_doc = frappe.get_doc(
-        "Employee Location", {"employee": employee, "date": date}
+    track = get_track_points(employee, date)
+    if not track:
+        frappe.throw("Location details not found for employee")
+    return track
+
+
+@frappe.whitelist()
+def get_employee_track(employee, date, zoom=None):
+    """Douglas-Peucker simplified track for the given map zoom plus the daily summary"""
+    track = get_track_points(employee, date)
+    if not track:
+        frappe.throw("Location details not found for employee")
+
+    latitudes = np.array([point.latitude for point in track], dtype=float)
+    longitudes = np.array([point.longitude for point in track], dtype=float)
+    tolerance = get_tolerance_meters(
+        cint(zoom) or DEFAULT_ZOOM, float(np.mean(latitudes))
+    )
+    keep = simplify_track(latitudes, longitudes, tolerance)
+    return {
+        "track": [track[index] for index in keep],
+        "total_points": len(track),
+        "summary": get_track_summary(employee, date, track),
+    }
+
+
+def get_track_points(employee, date):
+    track = get_location_track(employee, date)
+    if track:
+        return track
+
+    # days tracked before chunked storage was introduced
+    location_doc = frappe.db.get_value(
+        "Employee Location", {"employee": employee, "date": date}, "name"
     )
     if not location_doc:
-        frappe.throw("Location details not found for employee")
-    return location_doc.location
+        return []
+    return [
+        frappe._dict(
+            latitude=flt(row.latitude),
+            longitude=flt(row.longitude),
+            time=get_datetime(f"{getdate(date)} {row.time or '00:00:00'}"),
+        )
+        for row in frappe.get_all(
+            "Employee Location Details",
+            filters={"parent": location_doc, "parenttype": "Employee Location"},
+            fields=["latitude", "longitude", "time"],
+            order_by="idx asc",
+        )
+    ]
+
+
+def get_tolerance_meters(zoom, latitude):
+    meters_per_pixel = 156543.03392 * np.cos(np.radians(latitude)) / (2**zoom)
+    return meters_per_pixel * TOLERANCE_PIXELS
+
+
+def simplify_track(latitudes, longitudes, tolerance):
+    """Iterative Douglas-Peucker on a local metric projection, returns kept indexes"""
+    if len(latitudes) < 3:
+        return list(range(len(latitudes)))
+
+    origin = np.radians(latitudes[0])
+    x = np.radians(longitudes - longitudes[0]) * np.cos(origin) * 6371000
+    y = np.radians(latitudes - latitudes[0]) * 6371000
+
+    keep = np.zeros(len(latitudes), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(latitudes) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1 : end] - x[start], y[start + 1 : end] - y[start]
+        length = np.hypot(dx, dy)
+        if length:
+            distances = np.abs(dx * py - dy * px) / length
+        else:
+            distances = np.hypot(px, py)
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return [int(index) for index in np.nonzero(keep)[0]]
+
+
+def get_track_summary(employee, date, track):
+    """Cached per employee and date, the cache is dropped when a new chunk arrives"""
+    return frappe.cache().get_value(
+        get_track_summary_cache_key(employee, date),
+        generator=lambda: summarize_track(track),
+    )
+
+
+def summarize_track(track):
+    latitudes = np.array([point.latitude for point in track], dtype=float)
+    longitudes = np.array([point.longitude for point in track], dtype=float)
+    times = [get_datetime(point.time) for point in track]
+    seconds = np.array([(time - times[0]).total_seconds() for time in times])
+
+    step_km = haversine(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+    summary = {
+        "total_distance": flt(float(step_km.sum()), 3),
+        "start_time": times[0],
+        "end_time": times[-1],
+        "dwell_clusters": get_dwell_clusters(latitudes, longitudes, times),
+        "minutes_outside_geofence": 0,
+    }
+
+    geofences = get_geofences()
+    if geofences and len(track) > 1:
+        inside = geofences.evaluate(latitudes, longitudes)["inside"]
+        # a step counts as outside when it starts outside every fence
+        summary["minutes_outside_geofence"] = flt(
+            float(np.diff(seconds)[~inside[:-1]].sum()) / 60, 1
+        )
+    return summary
+
+
+def get_dwell_clusters(latitudes, longitudes, times):
+    clusters = []
+    start = 0
+    while start < len(times):
+        end = start
+        while (
+            end + 1 < len(times)
+            and haversine(
+                latitudes[start], longitudes[start], latitudes[end + 1], longitudes[end + 1]
+            )
+            * 1000
+            <= DWELL_RADIUS_METERS
+        ):
+            end += 1
+        minutes = (times[end] - times[start]).total_seconds() / 60
+        if minutes >= DWELL_MINUTES:
+            clusters.append(
+                {
+                    "latitude": flt(float(latitudes[start : end + 1].mean()), 6),
+                    "longitude": flt(float(longitudes[start : end + 1].mean()), 6),
+                    "start": times[start],
+                    "end": times[end],
+                    "minutes": flt(minutes, 1),
+                }
+            )
+        start = end + 1
+    return clusters
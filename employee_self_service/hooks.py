@@ -114,11 +114,80 @@ doctype_js = {"Employee Checkin": "public/js/employee_checkin.js"}
 # 	}
 # }
 doc_events = {
+    "*": {
+        "on_change": "employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval.update_pending_approval",
+        "on_trash": "employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval.update_pending_approval",
+    },
+    "Workflow": {
+        "on_update": "employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval.on_workflow_update"
+    },
+    "Employee": {
+        "validate": "employee_self_service.mobile.v1.employee_events.set_event_month_days"
+    },
     "Leave Application": {
-        "on_update": "employee_self_service.mobile.ess.on_leave_application_update"
+        "on_update": "employee_self_service.mobile.ess.on_leave_application_update",
+        "on_change": [
+            "employee_self_service.employee_self_service.doctype.ess_attendance_summary.ess_attendance_summary.on_attendance_change",
+            "employee_self_service.mobile.v1.leave_balance.on_leave_change",
+        ],
+        "on_trash": "employee_self_service.mobile.v1.leave_balance.on_leave_change",
+    },
+    "Leave Allocation": {
+        "on_change": "employee_self_service.mobile.v1.leave_balance.on_leave_change",
+        "on_trash": "employee_self_service.mobile.v1.leave_balance.on_leave_change",
+    },
+    "Leave Ledger Entry": {
+        "on_change": "employee_self_service.mobile.v1.leave_balance.on_leave_change",
+        "on_trash": "employee_self_service.mobile.v1.leave_balance.on_leave_change",
     },
     "Expense Claim": {
-        "on_submit": "employee_self_service.mobile.ess.on_expense_submit"
+        "on_submit": "employee_self_service.mobile.ess.on_expense_submit",
+        "on_change": "employee_self_service.mobile.v1.dashboard_cache.on_employee_document_change",
+        "on_trash": "employee_self_service.mobile.v1.dashboard_cache.on_employee_document_change",
+    },
+    "Employee Checkin": {
+        "on_change": [
+            "employee_self_service.mobile.v1.dashboard_cache.on_employee_document_change",
+            "employee_self_service.mobile.v1.attendance_cache.on_attendance_change",
+        ],
+        "on_trash": [
+            "employee_self_service.mobile.v1.dashboard_cache.on_employee_document_change",
+            "employee_self_service.mobile.v1.attendance_cache.on_attendance_change",
+        ],
+    },
+    "Attendance": {
+        "on_change": [
+            "employee_self_service.mobile.v1.attendance_cache.on_attendance_change",
+            "employee_self_service.employee_self_service.doctype.ess_attendance_summary.ess_attendance_summary.on_attendance_change",
+        ],
+        "on_trash": [
+            "employee_self_service.mobile.v1.attendance_cache.on_attendance_change",
+            "employee_self_service.employee_self_service.doctype.ess_attendance_summary.ess_attendance_summary.on_attendance_change",
+        ],
+    },
+    "Salary Slip": {
+        "on_submit": "employee_self_service.mobile.v1.pdf_cache.pre_render_salary_slip",
+        "on_change": "employee_self_service.mobile.v1.dashboard_cache.on_employee_document_change",
+        "on_trash": "employee_self_service.mobile.v1.dashboard_cache.on_employee_document_change",
+    },
+    "Office Geofencing": {
+        "on_change": "employee_self_service.mobile.v1.geofence.clear_geofence_cache",
+        "on_trash": "employee_self_service.mobile.v1.geofence.clear_geofence_cache",
+    },
+    "Branch": {
+        "on_change": "employee_self_service.mobile.v1.geofence.clear_geofence_cache",
+        "on_trash": "employee_self_service.mobile.v1.geofence.clear_geofence_cache",
+    },
+    "Item Price": {
+        "on_change": "employee_self_service.mobile.v1.pricing.clear_price_index",
+        "on_trash": "employee_self_service.mobile.v1.pricing.clear_price_index",
+    },
+    "Global Defaults": {
+        "on_update": "employee_self_service.mobile.v1.settings.clear_settings_snapshot"
+    },
+    "Notice Board": {
+        "on_change": "employee_self_service.mobile.v1.dashboard_cache.on_notice_board_change",
+        "on_trash": "employee_self_service.mobile.v1.dashboard_cache.on_notice_board_change",
     },
     "ToDo": {
         "after_insert": "employee_self_service.mobile.ess.send_notification_for_task_assign"
@@ -132,10 +201,18 @@ doc_events = {
 # ---------------
 
 scheduler_events = {
-    "daily": ["employee_self_service.mobile.ess.daily_notice_board_event"],
+    "daily": [
+        "employee_self_service.mobile.ess.daily_notice_board_event",
+        "employee_self_service.employee_self_service.doctype.ess_attendance_summary.ess_attendance_summary.reconcile_attendance_summary",
+    ],
     "cron": {
-        "0 9 * * *": ["employee_self_service.mobile.ess.send_notification_on_event"],
-        "0 9 * * *": ["employee_self_service.mobile.ess.on_holiday_event"],
+        "* * * * *": [
+            "employee_self_service.mobile.v1.shift_sync.flush_shift_last_sync",
+        ],
+        "0 9 * * *": [
+            "employee_self_service.mobile.v1.ess.send_notification_on_event",
+            "employee_self_service.mobile.v1.ess.on_holiday_event",
+        ],
     },
 }
 
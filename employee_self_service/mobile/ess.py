@@ -34,6 +34,8 @@ from erpnext.accounts.utils import get_fiscal_year
 from employee_self_service.employee_self_service.doctype.push_notification.push_notification import (
     create_push_notification,
 )
+from employee_self_service.mobile.v1.shift_sync import record_shift_checkin
+from employee_self_service.mobile.v1.employee_events import get_employee_events
 
 
 @frappe.whitelist(allow_guest=True)
@@ -620,13 +622,7 @@ def create_employee_log(log_type, location=None):
 
 
 def update_shift_last_sync(emp_data):
-    if emp_data.get("default_shift"):
-        frappe.db.set_value(
-            "Shift Type",
-            emp_data.get("default_shift"),
-            "last_sync_of_checkin",
-            now_datetime(),
-        )
+    record_shift_checkin(emp_data.get("default_shift"))
 
 
 def get_last_log_type(dashboard_data, employee):
@@ -670,40 +666,7 @@ def create_employee_birthday_board(event_type):
 
 
 def get_employees_having_an_event_today(event_type, date=None):
-    if event_type == "birthday":
-        condition_column = "date_of_birth"
-    elif event_type == "work_anniversary":
-        condition_column = "date_of_joining"
-    else:
-        return
-
-    employees_born_today = frappe.db.multisql(
-        {
-            "mariadb": f"""
-			SELECT `name` as 'emp_id',`personal_email`, `company`, `company_email`, `user_id`, `employee_name` AS 'name', `image`, `date_of_joining`
-			FROM `tabEmployee`
-			WHERE
-				DAY({condition_column}) = DAY(%(today)s)
-			AND
-				MONTH({condition_column}) = MONTH(%(today)s)
-			AND
-				`status` = 'Active'
-		""",
-            "postgres": f"""
-			SELECT "name" AS 'emp_id',"personal_email", "company", "company_email", "user_id", "employee_name" AS 'name', "image"
-			FROM "tabEmployee"
-			WHERE
-				DATE_PART('day', {condition_column}) = date_part('day', %(today)s)
-			AND
-				DATE_PART('month', {condition_column}) = date_part('month', %(today)s)    
-			AND
-				"status" = 'Active'
-		""",
-        },
-        dict(today=getdate(date), condition_column=condition_column),
-        as_dict=1,
-    )
-    return employees_born_today
+    return get_employee_events(event_type, date)
 
 
 @frappe.whitelist()
@@ -6,6 +6,7 @@ from employee_self_service.mobile.v1.api_utils import (
     gen_response,
     ess_validate,
     exception_handler,
+    get_list_page,
 )
 from employee_self_service.mobile.v1.file import get_attchment
 
@@ -118,16 +119,16 @@ def make_petty_expense_entry(*args, **data):
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_petty_expense_list(start=0, page_length=10, filters=None):
+def get_petty_expense_list(start=0, page_length=10, filters=None, cursor=None):
     try:
-        petty_expense_entry_list = frappe.get_list(
+        petty_expense_entry_list = get_list_page(
             "Petty Expense",
             fields=[
                 "*",
             ],
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
             filters=filters,
         )
         return gen_response(
@@ -1,7 +1,13 @@
+import base64
+import hashlib
+import json
+import time
+
 import frappe
 from bs4 import BeautifulSoup
 from frappe import _
-from frappe.utils import cstr
+from frappe.utils import cint, cstr, get_datetime
+from employee_self_service.mobile.v1.settings import get_settings_snapshot
 
 import wrapt
 
@@ -15,6 +21,22 @@ def gen_response(status, message, data=[]):
     frappe.response["data"] = data
 
 
+def set_etag(*parts):
+    """
+    Set the ETag of the response from values identifying its content.
+    Returns True when it matches the client's If-None-Match header, in which
+    case the caller answers with gen_response(304, ...).
+    """
+    etag = hashlib.md5("|".join(cstr(part) for part in parts).encode()).hexdigest()
+    frappe.response["etag"] = etag
+    if hasattr(frappe.local, "response_headers"):
+        frappe.local.response_headers.set("ETag", f'"{etag}"')
+    if_none_match = frappe.get_request_header("If-None-Match") or ""
+    return etag in [
+        tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")
+    ]
+
+
 def exception_handler(e):
     frappe.log_error(title="ESS Mobile App Error", message=frappe.get_traceback())
     if hasattr(e, "http_status_code"):
@@ -70,13 +92,11 @@ def validate_employee_data(employee_data):
 
 
 def get_ess_settings():
-    return frappe.get_doc(
-        "Employee Self Service Settings", "Employee Self Service Settings"
-    )
+    return get_settings_snapshot("Employee Self Service Settings")
 
 
 def get_global_defaults():
-    return frappe.get_doc("Global Defaults", "Global Defaults")
+    return get_settings_snapshot("Global Defaults")
 
 
 def remove_default_fields(data):
@@ -167,3 +187,157 @@ def get_system_timezone() -> str:
     return (
         frappe.get_system_settings("time_zone") or "Asia/Kolkata"
     )  # Default to India ?!
+
+
+def get_system_datetime(value):
+    """
+    Naive datetime in the system timezone, values sent by the app may carry an
+    offset and naive and aware datetimes cannot be compared
+    """
+    from pytz import timezone
+
+    value = get_datetime(value)
+    if value and value.tzinfo:
+        value = value.astimezone(timezone(get_system_timezone())).replace(
+            tzinfo=None
+        )
+    return value
+
+
+def get_list_page(
+    doctype,
+    fields,
+    filters=None,
+    start=0,
+    page_length=10,
+    cursor=None,
+    sort_field="modified",
+    list_method=None,
+):
+    """
+    One page of a list endpoint, newest first.
+
+    Without a cursor this is the usual OFFSET paging. Passing a cursor (empty
+    for the first page) switches to keyset paging on (sort_field, name): the
+    page continues right after the row the cursor points to, and the cursor
+    of the next page is returned as `next_cursor` next to `data`.
+    """
+    list_method = list_method or frappe.get_list
+    if cursor is None:
+        return list_method(
+            doctype,
+            fields=fields,
+            filters=filters,
+            start=start,
+            page_length=page_length,
+            order_by=f"{sort_field} desc",
+        )
+
+    page_length = cint(page_length) or 10
+    filters = get_filter_list(doctype, filters)
+    or_filters = None
+    if cursor:
+        sort_value, name = decode_cursor(cursor)
+        # sort_field <= value and (sort_field < value or name < last name)
+        filters.append([doctype, sort_field, "<=", sort_value])
+        or_filters = [
+            [doctype, sort_field, "<", sort_value],
+            [doctype, "name", "<", name],
+        ]
+    rows = list_method(
+        doctype,
+        fields=list(fields) + [f"{sort_field} as cursor_sort_key"],
+        filters=filters,
+        or_filters=or_filters,
+        page_length=page_length + 1,
+        order_by=f"`tab{doctype}`.`{sort_field}` desc, `tab{doctype}`.`name` desc",
+    )
+    next_cursor = None
+    if len(rows) > page_length:
+        rows = rows[:page_length]
+        next_cursor = encode_cursor(rows[-1].cursor_sort_key, rows[-1].name)
+    for row in rows:
+        del row["cursor_sort_key"]
+    frappe.response["next_cursor"] = next_cursor
+    return rows
+
+
+def get_filter_list(doctype, filters):
+    """Normalise dict / JSON filters to a list so more conditions can be appended"""
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    if not filters:
+        return []
+    if isinstance(filters, dict):
+        filter_list = []
+        for fieldname, value in filters.items():
+            if isinstance(value, (list, tuple)):
+                filter_list.append([doctype, fieldname, value[0], value[1]])
+            else:
+                filter_list.append([doctype, fieldname, "=", value])
+        return filter_list
+    return list(filters)
+
+
+def encode_cursor(sort_value, name):
+    return (
+        base64.urlsafe_b64encode(json.dumps([cstr(sort_value), name]).encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, name = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        frappe.throw(_("Invalid cursor"))
+    return sort_value, name
+
+
+def benchmark_pagination(doctype="Task", page_length=20, pages=(1, 10, 100, 500)):
+    """bench execute employee_self_service.mobile.v1.api_utils.benchmark_pagination"""
+    results = []
+    for page in pages:
+        offset = (page - 1) * page_length
+        cursor = ""
+        if offset:
+            last_row = frappe.get_all(
+                doctype,
+                fields=["name", "modified"],
+                order_by="modified desc, name desc",
+                start=offset - 1,
+                page_length=1,
+            )
+            if not last_row:
+                break
+            cursor = encode_cursor(last_row[0].modified, last_row[0].name)
+
+        start_time = time.perf_counter()
+        get_list_page(
+            doctype,
+            ["name"],
+            start=offset,
+            page_length=page_length,
+            list_method=frappe.get_all,
+        )
+        offset_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        get_list_page(
+            doctype,
+            ["name"],
+            page_length=page_length,
+            cursor=cursor,
+            list_method=frappe.get_all,
+        )
+        cursor_seconds = time.perf_counter() - start_time
+        results.append(
+            {
+                "page": page,
+                "offset_seconds": round(offset_seconds, 4),
+                "cursor_seconds": round(cursor_seconds, 4),
+            }
+        )
+    return results
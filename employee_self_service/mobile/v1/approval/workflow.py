@@ -6,8 +6,11 @@ from employee_self_service.mobile.v1.api_utils import (
     get_employee_by_user,
 )
 from frappe.utils import cint,get_url_to_form
-from operator import itemgetter
 from frappe.model.workflow import get_transitions
+from employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval import (
+    get_pending_approvals,
+    get_pending_approval_count,
+)
 
 
 
@@ -31,45 +34,23 @@ def get_active_workflow_document(internal=False):
 @ess_validate(methods=["GET"])
 def get_workflow_documents(start=1, page_length=10,document_type=None,internal=False):
     try:
-        documents = []
-        if document_type == "All" or not document_type:
-            workflows = get_active_workflow_document(internal=True)
-
-            for row in workflows:
-                workflow_documents = frappe.get_list(row.document_type, filters={}, fields=["name", "workflow_state", "modified"], order_by="modified desc")
-                append_document(workflow_documents=workflow_documents, documents=documents, doctype=row.document_type)
-        else:
-            workflow_documents = frappe.get_list(document_type, filters={}, fields=["name", "workflow_state", "modified"], order_by="modified desc")
-            append_document(workflow_documents=workflow_documents, documents=documents, doctype=document_type)
-            
+        if document_type == "All":
+            document_type = None
         if internal:
-            return len(documents)
-        # Sort documents by modified date
-        documents.sort(key=itemgetter("modified"), reverse=True)
-
-        # Pagination
-        start_index = (cint(start) - 1) * cint(page_length)
-        end_index = min(start_index + cint(page_length), len(documents))
-        paginated_documents = documents[start_index:end_index]
+            return get_pending_approval_count(document_type=document_type)
 
+        # Served from the ESS Pending Approval index, see ess_pending_approval.py
+        paginated_documents = get_pending_approvals(
+            document_type=document_type,
+            start=(cint(start) - 1) * cint(page_length),
+            page_length=cint(page_length),
+        )
         return gen_response(200, "Workflow documents fetched successfully", paginated_documents)
     except frappe.PermissionError:
         return gen_response(500, "Not permitted to read Timesheet")
     except Exception as e:
         return exception_handler(e)
 
-def append_document(workflow_documents, documents, doctype):
-    for row in workflow_documents:
-        doc = frappe.get_doc(doctype, row["name"])
-        try:
-            transitions = get_transitions(doc)
-            # Only append documents that have available actions (transitions)
-            if transitions:
-                row["doctype"] = doctype
-                documents.append(row)
-        except Exception as e:
-            pass
-
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
 def get_actions(document_type,document_no):
@@ -114,14 +95,9 @@ def get_erp_link_for_document(document_type,document_no):
 @ess_validate(methods=["GET"])
 def get_print(document_type,document_no):
     try:
-        default_print_format = frappe.db.get_value("Property Setter",dict(property="default_print_format", doc_type=document_type),"value") or "Standard"
-        from frappe.utils.print_format import download_pdf
+        from employee_self_service.mobile.v1.pdf_cache import set_pdf_response
 
-        return download_pdf(
-            doctype=document_type,
-            name=document_no,
-            format=default_print_format,
-        )
+        return set_pdf_response(frappe.get_doc(document_type, document_no))
     except Exception as e:
         return exception_handler(e)
     
\ No newline at end of file
@@ -0,0 +1,61 @@
+import frappe
+from frappe.utils import cint, getdate
+
+"""
+Per-employee, per-month cache of the mobile attendance list.
+
+Entries are dropped when an Attendance of that employee and month, or a
+check-in linked to one, changes (see doc_events in hooks.py).
+"""
+
+ATTENDANCE_LIST_KEY = "ess_attendance_list"
+ATTENDANCE_LIST_TTL = 24 * 60 * 60
+
+
+def get_attendance_list_key(employee, year, month):
+    return f"{ATTENDANCE_LIST_KEY}|{employee}|{cint(year)}-{cint(month):02d}"
+
+
+def get_cached_attendance_list(employee, year, month, build_attendance_list):
+    cache = frappe.cache()
+    key = get_attendance_list_key(employee, year, month)
+    data = cache.get_value(key)
+    if data is None:
+        data = build_attendance_list()
+        cache.set_value(key, data, expires_in_sec=ATTENDANCE_LIST_TTL)
+    return data
+
+
+def invalidate_attendance_list(employee, date):
+    date = getdate(date)
+    key = get_attendance_list_key(employee, date.year, date.month)
+    frappe.cache().delete_value(key)
+    # again after commit, a read in between may have cached the old rows
+    frappe.db.after_commit.add(lambda: frappe.cache().delete_value(key))
+
+
+def on_attendance_change(doc, event):
+    """
+    Attendance and Employee Checkin. The list is keyed on the attendance month:
+    a check-in counts for the month of the Attendance it is linked to, which
+    for night shifts can differ from the month of the check-in time. HRMS links
+    check-ins with a raw update that fires no event, the Attendance events
+    cover that, since the link is written in the same transaction.
+    """
+    docs = [doc]
+    doc_before_save = doc.get_doc_before_save()
+    if doc_before_save:
+        docs.append(doc_before_save)
+    for row in docs:
+        if not row.get("employee"):
+            continue
+        if row.doctype == "Attendance":
+            attendance_date = row.get("attendance_date")
+        elif row.get("attendance"):
+            attendance_date = frappe.db.get_value(
+                "Attendance", row.attendance, "attendance_date"
+            )
+        else:
+            continue
+        if attendance_date:
+            invalidate_attendance_list(row.employee, attendance_date)
@@ -0,0 +1,175 @@
+import json
+
+import frappe
+from frappe.utils import add_to_date, cstr, get_datetime, now_datetime
+from employee_self_service.mobile.v1.api_utils import (
+    gen_response,
+    ess_validate,
+    exception_handler,
+    get_global_defaults,
+)
+from employee_self_service.mobile.v1.pricing import (
+    get_default_price_list,
+    get_price_index,
+)
+
+"""
+Item catalog sync for the order screens.
+
+Without a watermark the full catalog (mobile Items with rates, Item Groups and
+Warehouses) is returned. With the watermark of a previous response only rows
+modified since then come back, plus tombstones for rows that were deleted or
+are no longer visible on mobile. Rows are upserts keyed by name, so the small
+overlap applied to the watermark only resends rows the app already has.
+"""
+
+# rows saved by transactions still open when the previous sync ran carry a
+# modified timestamp slightly before its watermark
+SYNC_OVERLAP_SECONDS = 60
+ITEM_FIELDS = [
+    "name",
+    "item_code",
+    "item_name",
+    "item_group",
+    "stock_uom",
+    "image",
+    "modified",
+]
+# rows outside these filters are not part of the mobile catalog
+VISIBILITY_FILTERS = {
+    "Item": {"show_in_mobile": 1, "disabled": 0},
+    "Item Group": {"show_in_mobile": 1},
+    "Warehouse": {"is_group": 0, "disabled": 0},
+}
+
+
+@frappe.whitelist()
+@ess_validate(methods=["GET"])
+def sync_catalog(since=None, customer=None):
+    try:
+        watermark = now_datetime()
+        since = (
+            add_to_date(get_datetime(since), seconds=-SYNC_OVERLAP_SECONDS)
+            if since
+            else None
+        )
+        price_list = get_default_price_list(customer=customer)
+        items, deleted_items = get_catalog_items(since, price_list)
+        item_groups, deleted_item_groups = get_catalog_rows(
+            "Item Group", ["name", "parent_item_group", "modified"], since
+        )
+        warehouses, deleted_warehouses = get_catalog_rows(
+            "Warehouse", ["name", "warehouse_name", "company", "modified"], since
+        )
+        gen_response(
+            200,
+            "Catalog synced successfully",
+            {
+                "full": not since,
+                "watermark": cstr(watermark),
+                "price_list": price_list,
+                "currency": get_global_defaults().get("default_currency"),
+                "items": items,
+                "item_groups": item_groups,
+                "warehouses": warehouses,
+                "deleted": {
+                    "items": deleted_items,
+                    "item_groups": deleted_item_groups,
+                    "warehouses": deleted_warehouses,
+                },
+            },
+        )
+    except frappe.PermissionError:
+        return gen_response(500, "Not permitted for item")
+    except Exception as e:
+        return exception_handler(e)
+
+
+def get_visibility_filters(doctype):
+    return [
+        [doctype, field, "=", value]
+        for field, value in VISIBILITY_FILTERS[doctype].items()
+    ]
+
+
+def get_catalog_rows(doctype, fields, since):
+    """Visible rows of a doctype (changed since the watermark) and tombstones"""
+    visibility = VISIBILITY_FILTERS[doctype]
+    if not since:
+        return (
+            frappe.get_list(
+                doctype,
+                fields=fields,
+                filters=get_visibility_filters(doctype),
+                order_by="name asc",
+            ),
+            [],
+        )
+
+    rows, deleted = [], []
+    for row in frappe.get_list(
+        doctype,
+        fields=fields + list(visibility),
+        filters=[[doctype, "modified", ">=", since]],
+        order_by="name asc",
+    ):
+        values = {field: row.pop(field) for field in visibility}
+        if values == visibility:
+            rows.append(row)
+        else:
+            deleted.append(row.name)
+    deleted.extend(get_deleted_names(doctype, since))
+    return rows, deleted
+
+
+def get_catalog_items(since, price_list):
+    items, deleted = get_catalog_rows("Item", ITEM_FIELDS, since)
+    if since and price_list:
+        # items whose price changed are resent even when the Item itself is
+        # untouched
+        changed_items = {item.name for item in items}
+        repriced = set(
+            frappe.get_all(
+                "Item Price",
+                filters={"price_list": price_list, "modified": [">=", since]},
+                pluck="item_code",
+            )
+        )
+        repriced.update(get_deleted_item_prices(price_list, since))
+        repriced -= changed_items | set(deleted)
+        if repriced:
+            items.extend(
+                frappe.get_list(
+                    "Item",
+                    fields=ITEM_FIELDS,
+                    filters=[["Item", "name", "in", list(repriced)]]
+                    + get_visibility_filters("Item"),
+                    order_by="name asc",
+                )
+            )
+
+    price_index = get_price_index(price_list) if price_list else {}
+    for item in items:
+        item["rate"] = price_index.get(item.name, 0.0)
+    return items, deleted
+
+
+def get_deleted_names(doctype, since):
+    return frappe.get_all(
+        "Deleted Document",
+        filters={"deleted_doctype": doctype, "creation": [">=", since]},
+        pluck="deleted_name",
+    )
+
+
+def get_deleted_item_prices(price_list, since):
+    item_codes = []
+    for data in frappe.get_all(
+        "Deleted Document",
+        filters={"deleted_doctype": "Item Price", "creation": [">=", since]},
+        pluck="data",
+    ):
+        item_price = json.loads(data)
+        if item_price.get("price_list") == price_list:
+            item_codes.append(item_price.get("item_code"))
+    return item_codes
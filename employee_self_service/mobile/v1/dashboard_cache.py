@@ -0,0 +1,75 @@
+import frappe
+from frappe.utils import today
+
+"""
+Per-employee dashboard snapshot cache.
+
+The snapshot holds the employee specific part of the mobile dashboard (notice
+board, logs, latest expense / salary slip). It is rebuilt only when one of the
+source documents changes (see doc_events in hooks.py) or when the TTL runs out.
+The approval count is left out: it depends on roles and any workflow document,
+and is a single COUNT on the ESS Pending Approval index anyway.
+"""
+
+SNAPSHOT_KEY = "ess_dashboard_snapshot"
+GENERATION_KEY = "ess_dashboard_snapshot_generation"
+HITS_KEY = "ess_dashboard_snapshot_hits"
+MISSES_KEY = "ess_dashboard_snapshot_misses"
+SNAPSHOT_TTL = 10 * 60
+
+
+def get_dashboard_snapshot(employee, build_snapshot):
+    cache = frappe.cache()
+    key = f"{SNAPSHOT_KEY}|{employee}"
+    generation = cache.get_value(GENERATION_KEY) or 0
+    snapshot = cache.get_value(key)
+    if (
+        snapshot
+        and snapshot.get("date") == today()
+        and snapshot.get("generation") == generation
+    ):
+        cache.incr(cache.make_key(HITS_KEY))
+        return snapshot.get("data")
+
+    cache.incr(cache.make_key(MISSES_KEY))
+    data = build_snapshot()
+    cache.set_value(
+        key,
+        {"date": today(), "generation": generation, "data": data},
+        expires_in_sec=SNAPSHOT_TTL,
+    )
+    return data
+
+
+def invalidate_dashboard_snapshot(employee=None):
+    """Drop the snapshot of one employee, or of everyone when no employee is given"""
+    cache = frappe.cache()
+    if employee:
+        cache.delete_value(f"{SNAPSHOT_KEY}|{employee}")
+    else:
+        cache.set_value(GENERATION_KEY, (cache.get_value(GENERATION_KEY) or 0) + 1)
+
+
+@frappe.whitelist()
+def get_dashboard_cache_stats():
+    frappe.only_for("System Manager")
+    cache = frappe.cache()
+    return {
+        "hits": int(cache.get(cache.make_key(HITS_KEY)) or 0),
+        "misses": int(cache.get(cache.make_key(MISSES_KEY)) or 0),
+    }
+
+
+def on_employee_document_change(doc, event):
+    """Employee Checkin, Expense Claim and Salary Slip"""
+    if doc.get("employee"):
+        invalidate_dashboard_snapshot(doc.employee)
+
+
+def on_notice_board_change(doc, event):
+    if doc.get("apply_for") == "Specific Employees":
+        for row in doc.get("employees") or []:
+            invalidate_dashboard_snapshot(row.employee)
+    else:
+        invalidate_dashboard_snapshot()
+
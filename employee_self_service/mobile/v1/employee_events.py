@@ -0,0 +1,220 @@
+import calendar
+import datetime
+
+import frappe
+from frappe.utils import cint, date_diff, getdate
+from employee_self_service.mobile.v1.api_utils import (
+    ess_validate,
+    exception_handler,
+    gen_response,
+    get_employee_by_user,
+)
+
+"""
+Birthday and work anniversary lookups.
+
+Employee stores the month and day of date_of_birth and date_of_joining as an
+indexed MMDD integer (ess_birth_month_day, ess_joining_month_day), set on
+every save and backfilled on migrate. Events of a date range are then an
+index range scan instead of DAY()/MONTH() over the whole Employee table.
+Employees born on 29 February have their birthday on 28 February in common
+years.
+"""
+
+EVENT_FIELDS = {
+    "birthday": ("date_of_birth", "ess_birth_month_day"),
+    "work_anniversary": ("date_of_joining", "ess_joining_month_day"),
+}
+EMPLOYEE_FIELDS = [
+    "name as emp_id",
+    "personal_email",
+    "company",
+    "company_email",
+    "user_id",
+    "employee_name as name",
+    "image",
+    "date_of_joining",
+]
+MAX_RANGE_DAYS = 366
+
+
+def get_month_day(date):
+    date = getdate(date)
+    return date.month * 100 + date.day if date else 0
+
+
+def set_event_month_days(doc, method=None):
+    """Employee validate"""
+    for date_field, month_day_field in EVENT_FIELDS.values():
+        doc.set(month_day_field, get_month_day(doc.get(date_field)))
+
+
+def backfill_event_month_days():
+    for date_field, month_day_field in EVENT_FIELDS.values():
+        frappe.db.sql(
+            f"""UPDATE `tabEmployee`
+            SET `{month_day_field}` = EXTRACT(MONTH FROM `{date_field}`) * 100
+                + EXTRACT(DAY FROM `{date_field}`)
+            WHERE `{date_field}` IS NOT NULL
+            AND COALESCE(`{month_day_field}`, 0)
+                != EXTRACT(MONTH FROM `{date_field}`) * 100
+                + EXTRACT(DAY FROM `{date_field}`)"""
+        )
+
+
+def get_month_day_filters(month_day_field, from_date, to_date):
+    """filters, or_filters of the month days between the two dates"""
+    if date_diff(to_date, from_date) >= 365:
+        return [], []
+    start, end = get_month_day(from_date), get_month_day(to_date)
+    if end == 228 and not calendar.isleap(to_date.year):
+        # 29 February birthdays fall on 28 February in common years
+        end = 229
+    if start <= end:
+        return [[month_day_field, "between", [start, end]]], []
+    # the range crosses the new year
+    return [], [[month_day_field, ">=", start], [month_day_field, "<=", end]]
+
+
+def get_event_date(month_day, year):
+    month, day = divmod(month_day, 100)
+    if (month, day) == (2, 29) and not calendar.isleap(year):
+        day = 28
+    return datetime.date(year, month, day)
+
+
+def get_employee_events(event_type, from_date, to_date=None):
+    """
+    Active employees having the event between the two dates (inclusive), one
+    row per occurrence with event_type and event_date, ordered by date
+    """
+    if event_type not in EVENT_FIELDS:
+        return []
+    from_date = getdate(from_date)
+    to_date = getdate(to_date or from_date)
+    if date_diff(to_date, from_date) >= MAX_RANGE_DAYS:
+        frappe.throw(f"Date range cannot be longer than {MAX_RANGE_DAYS} days")
+
+    month_day_field = EVENT_FIELDS[event_type][1]
+    filters, or_filters = get_month_day_filters(month_day_field, from_date, to_date)
+    filters.append(["status", "=", "Active"])
+    events = []
+    for employee in frappe.get_all(
+        "Employee",
+        filters=filters,
+        or_filters=or_filters,
+        fields=EMPLOYEE_FIELDS + [month_day_field],
+    ):
+        month_day = employee.pop(month_day_field)
+        if not month_day:
+            continue
+        for year in range(from_date.year, to_date.year + 1):
+            event_date = get_event_date(month_day, year)
+            if from_date <= event_date <= to_date:
+                events.append(
+                    frappe._dict(
+                        employee, event_type=event_type, event_date=event_date
+                    )
+                )
+    return sorted(events, key=lambda event: (event.event_date, event.name))
+
+
+@frappe.whitelist()
+@ess_validate(methods=["GET"])
+def get_events(from_date, to_date, event_type=None):
+    """Birthdays and work anniversaries between two dates, for employees only"""
+    try:
+        if not get_employee_by_user(frappe.session.user):
+            return gen_response(403, "Only employees can view employee events")
+        event_types = [event_type] if event_type else list(EVENT_FIELDS)
+        events = []
+        for row in event_types:
+            events.extend(get_employee_events(row, from_date, to_date))
+        events.sort(key=lambda event: (event.event_date, event.name))
+        return gen_response(
+            200,
+            "Events get successfully",
+            [
+                {
+                    "name": event.name,
+                    "image": event.image,
+                    "event_type": event.event_type,
+                    "event_date": event.event_date.strftime("%d-%m-%Y"),
+                }
+                for event in events
+            ],
+        )
+    except Exception as e:
+        return exception_handler(e)
+
+
+def benchmark(employees=50000, runs=20):
+    """
+    bench execute employee_self_service.mobile.v1.employee_events.benchmark
+
+    Builds a temporary Employee-like table and compares the DAY()/MONTH() scan
+    with the indexed month-day lookup for today's birthdays.
+    """
+    import random
+    import time
+
+    from frappe.utils import add_days, today
+
+    table = "ESS Employee Event Benchmark"
+    frappe.db.sql(
+        f"""CREATE TEMPORARY TABLE `tab{table}` (
+        `name` varchar(140) PRIMARY KEY,
+        `employee_name` varchar(140),
+        `status` varchar(20),
+        `date_of_birth` date,
+        `ess_birth_month_day` int,
+        INDEX `ess_birth_month_day` (`ess_birth_month_day`))"""
+    )
+    rng = random.Random(0)
+    rows = []
+    for index in range(cint(employees)):
+        date_of_birth = getdate(add_days("1960-01-01", rng.randint(0, 365 * 45)))
+        rows.append(
+            (
+                f"EMP-{index:06d}",
+                f"Employee {index}",
+                "Active" if rng.random() < 0.9 else "Left",
+                date_of_birth,
+                get_month_day(date_of_birth),
+            )
+        )
+    frappe.db.bulk_insert(
+        table,
+        ["name", "employee_name", "status", "date_of_birth", "ess_birth_month_day"],
+        rows,
+    )
+
+    date = getdate(today())
+    queries = {
+        "day_month_scan": (
+            f"""SELECT name FROM `tab{table}`
+            WHERE DAY(date_of_birth) = DAY(%(date)s)
+            AND MONTH(date_of_birth) = MONTH(%(date)s)
+            AND status = 'Active'""",
+            {"date": date},
+        ),
+        "month_day_index": (
+            f"""SELECT name FROM `tab{table}`
+            WHERE ess_birth_month_day = %(month_day)s
+            AND status = 'Active'""",
+            {"month_day": get_month_day(date)},
+        ),
+    }
+    result = {"employees": cint(employees), "runs": cint(runs)}
+    for label, (query, values) in queries.items():
+        start_time = time.perf_counter()
+        for _ in range(cint(runs)):
+            matches = len(frappe.db.sql(query, values))
+        elapsed = time.perf_counter() - start_time
+        result[label] = {
+            "matches": matches,
+            "ms_per_query": round(elapsed / cint(runs) * 1000, 3),
+        }
+    frappe.db.commit()
+    frappe.db.sql(f"DROP TEMPORARY TABLE `tab{table}`")
+    return result
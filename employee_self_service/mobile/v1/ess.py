@@ -1,12 +1,12 @@
 import json
 import os
+import time
 import calendar
 import frappe
 from frappe import _
 from frappe.auth import LoginManager
 from frappe.utils import (
     cstr,
-    get_date_str,
     today,
     nowdate,
     getdate,
@@ -17,7 +17,7 @@ from frappe.utils import (
     flt,
     pretty_date,
     fmt_money,
-    add_days,
+    add_to_date,
     format_time,
 )
 from employee_self_service.mobile.v1.api_utils import (
@@ -30,15 +30,50 @@ from employee_self_service.mobile.v1.api_utils import (
     get_global_defaults,
     exception_handler,
     convert_timezone,
-    get_system_timezone
+    get_system_timezone,
+    get_list_page,
+    set_etag,
+    get_system_datetime,
 )
 from frappe.handler import upload_file
 from erpnext.accounts.utils import get_fiscal_year
 
 from employee_self_service.employee_self_service.doctype.push_notification.push_notification import (
     create_push_notification,
+    create_push_notifications,
 )
-from employee_self_service.mobile.v1.approval.workflow import get_workflow_documents
+from employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval import (
+    get_pending_approval_count,
+)
+from employee_self_service.mobile.v1.dashboard_cache import get_dashboard_snapshot
+from employee_self_service.mobile.v1.attendance_cache import get_cached_attendance_list
+from employee_self_service.mobile.v1.leave_balance import (
+    get_leave_balance,
+    get_leave_type_balances,
+)
+from employee_self_service.mobile.v1.pdf_cache import (
+    get_salary_slip_print_format,
+    set_pdf_response,
+)
+from employee_self_service.mobile.v1.statement import (
+    get_statement,
+    get_statement_job,
+)
+from employee_self_service.employee_self_service.doctype.ess_attendance_summary.ess_attendance_summary import (
+    get_attendance_summary,
+    get_holiday_count,
+)
+from employee_self_service.mobile.v1.geofence import get_geofences
+from employee_self_service.mobile.v1.employee_events import get_employee_events
+from employee_self_service.mobile.v1.shift_sync import record_shift_checkin
+from employee_self_service.mobile.v1.file import get_download_url
+from employee_self_service.mobile.v1.image_processing import (
+    enqueue_image_processing,
+    get_thumbnail_urls,
+)
+
+MAX_CHECKIN_BATCH = 500
+
 
 @frappe.whitelist(allow_guest=True)
 def login(usr, pwd):
@@ -96,23 +131,13 @@ def make_leave_application(*args, **kwargs):
 @ess_validate(methods=["GET"])
 def get_leave_type(from_date=None, to_date=None):
     try:
-        from hrms.hr.doctype.leave_application.leave_application import (
-            get_leave_balance_on,
-        )
-
         if not from_date:
             from_date = today()
         emp_data = get_employee_by_user(frappe.session.user)
-        leave_types = frappe.get_all(
-            "Leave Type", filters={}, fields=["name", "'0' as balance"]
-        )
+        balances = get_leave_type_balances(emp_data.get("name"), from_date)
+        leave_types = frappe.get_all("Leave Type", filters={}, fields=["name"])
         for leave_type in leave_types:
-            leave_type["balance"] = get_leave_balance_on(
-                emp_data.get("name"),
-                leave_type.get("name"),
-                from_date,
-                consider_all_leaves_in_the_allocation_period=True,
-            )
+            leave_type["balance"] = balances.get(leave_type.name, 0.0)
         return gen_response(200, "Leave type get successfully", leave_types)
     except Exception as e:
         return exception_handler(e)
@@ -151,34 +176,16 @@ def get_leave_application_list():
         fiscal_year = get_fiscal_year(nowdate())[0]
         if not fiscal_year:
             return gen_response(500, "Fiscal year not set")
-        res = get_leave_balance_report(
-            emp_data.get("name"), emp_data.get("company"), fiscal_year
-        )
         leave_applications = {
             "upcoming": upcoming_leaves,
             "taken": taken_leaves,
-            "balance": res["result"],
+            "balance": get_leave_balance(emp_data.get("name")),
         }
         return gen_response(200, "Leave data getting successfully", leave_applications)
     except Exception as e:
         return exception_handler(e)
 
 
-def get_leave_balance_report(employee, company, fiscal_year):
-    fiscal_year = get_fiscal_year(fiscal_year=fiscal_year, as_dict=True)
-    year_start_date = get_date_str(fiscal_year.get("year_start_date"))
-    # year_end_date = get_date_str(fiscal_year.get("year_end_date"))
-    filters_leave_balance = {
-        "from_date": year_start_date,
-        "to_date": add_days(today(), 1),
-        "company": company,
-        "employee": employee,
-    }
-    from frappe.desk.query_report import run
-
-    return run("Employee Leave Balance", filters=filters_leave_balance)
-
-
 # moved to expense.py
 @frappe.whitelist()
 def get_expense_type():
@@ -310,32 +317,101 @@ def get_month_year_details(expense):
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_salary_sllip():
+def get_salary_sllip(start=0, page_length=12):
     try:
         emp_data = get_employee_by_user(frappe.session.user)
         if not len(emp_data) >= 1:
             return gen_response(500, "Employee does not exists")
         validate_employee_data(emp_data)
+        filters = {"employee": emp_data.get("name")}
+        slip_count, last_modified = frappe.get_all(
+            "Salary Slip",
+            filters=filters,
+            fields=["count(name)", "max(modified)"],
+            as_list=1,
+        )[0]
+        if set_etag(
+            emp_data.get("name"), slip_count, last_modified, start, page_length
+        ):
+            return gen_response(304, "Salary slip list not modified")
+
         salary_slip_list = frappe.get_all(
             "Salary Slip",
-            filters={"employee": emp_data.get("name")},
-            fields=["posting_date", "name"],
+            filters=filters,
+            fields=[
+                "name",
+                "posting_date",
+                "start_date",
+                "end_date",
+                "gross_pay",
+                "net_pay",
+                "currency",
+                "status",
+            ],
+            start=start,
+            page_length=page_length,
+            order_by="posting_date desc",
         )
         ss_data = []
         for ss in salary_slip_list:
-            ss_details = {}
-            month_year = get_month_year_details(ss)
-            ss_details["month_year"] = month_year
-            ss_details["salary_slip_id"] = ss.name
-            ss_details["details"] = get_salary_slip_details(ss.name)
-            ss_data.append(ss_details)
+            ss_data.append(
+                {
+                    "month_year": get_month_year_details(ss),
+                    "salary_slip_id": ss.name,
+                    "start_date": ss.start_date,
+                    "end_date": ss.end_date,
+                    "gross_pay": ss.gross_pay,
+                    "net_pay": ss.net_pay,
+                    "currency": ss.currency,
+                    "status": ss.status,
+                }
+            )
         return gen_response(200, "Salary slip details get successfully", ss_data)
     except Exception as e:
         return exception_handler(e)
 
 
+@frappe.whitelist()
+@ess_validate(methods=["GET"])
 def get_salary_slip_details(ss_id):
-    return frappe.get_doc("Salary Slip", ss_id)
+    try:
+        emp_data = get_employee_by_user(frappe.session.user)
+        salary_slip = frappe.db.get_value(
+            "Salary Slip",
+            ss_id,
+            [
+                "name",
+                "employee",
+                "posting_date",
+                "start_date",
+                "end_date",
+                "payment_days",
+                "total_working_days",
+                "gross_pay",
+                "total_deduction",
+                "net_pay",
+                "currency",
+                "status",
+            ],
+            as_dict=1,
+        )
+        if not salary_slip or salary_slip.employee != emp_data.get("name"):
+            return gen_response(
+                500, "Does not have persmission to read this salary slip"
+            )
+        components = frappe.get_all(
+            "Salary Detail",
+            filters={"parenttype": "Salary Slip", "parent": ss_id},
+            fields=["parentfield", "salary_component", "abbr", "amount"],
+            order_by="idx asc",
+        )
+        salary_slip["earnings"], salary_slip["deductions"] = [], []
+        for component in components:
+            salary_slip[component.pop("parentfield")].append(component)
+        salary_slip["month_year"] = get_month_year_details(salary_slip)
+        return gen_response(200, "Salary slip details get successfully", salary_slip)
+    except Exception as e:
+        return exception_handler(e)
 
 
 @frappe.whitelist()
@@ -348,24 +424,7 @@ def download_salary_slip(ss_id):
             return gen_response(
                 500, "Does not have persmission to read this salary slip"
             )
-        default_print_format = frappe.db.get_value(
-            "Employee Self Service Settings",
-            "Employee Self Service Settings",
-            "default_print_format",
-        )
-        if not default_print_format:
-            default_print_format = (
-                frappe.db.get_value(
-                    "Property Setter",
-                    dict(property="default_print_format", doc_type=res.doctype),
-                    "value",
-                )
-                or "Standard"
-            )
-        language = frappe.get_system_settings("language")
-        # return  frappe.utils.get_url()
-        url = f"{ frappe.utils.get_url() }/{ res.doctype }/{ res.name }?format={ default_print_format or 'Standard' }&_lang={ language }&key={ res.get_signature() }"
-        # return url
+        default_print_format = get_salary_slip_print_format()
         download_pdf(res.doctype, res.name, default_print_format, res)
     except Exception as e:
         return exception_handler(e)
@@ -373,14 +432,9 @@ def download_salary_slip(ss_id):
 
 @frappe.whitelist()
 def download_pdf(doctype, name, format=None, doc=None, no_letterhead=0):
-    from frappe.utils.pdf import get_pdf, cleanup
-
-    html = frappe.get_print(doctype, name, format, doc=doc, no_letterhead=no_letterhead)
-    frappe.local.response.filename = "{name}.pdf".format(
-        name=name.replace(" ", "-").replace("/", "-")
+    set_pdf_response(
+        doc or frappe.get_doc(doctype, name), format, no_letterhead=no_letterhead
     )
-    frappe.local.response.filecontent = get_pdf(html)
-    frappe.local.response.type = "download"
 
 
 @frappe.whitelist()
@@ -390,45 +444,56 @@ def get_dashboard():
         emp_data = get_employee_by_user(
             frappe.session.user, fields=["name", "company", "image", "employee_name"]
         )
-        notice_board = get_notice_board(emp_data.get("name"))
-        # attendance_details = get_attendance_details(emp_data)
-        log_details = get_last_log_details(emp_data.get("name"))
         settings = get_ess_settings()
         dashboard_data = {
-            "notice_board": notice_board,
             "leave_balance": [],
             "latest_leave": {},
-            "latest_expense": {},
-            "latest_salary_slip": {},
             "stop_location_validate": settings.get("location_validate"),
-            "last_log_type": log_details.get("log_type"),
             "version": settings.get("version") or "1.0",
             "update_version_forcefully": settings.get("update_version_forcefully") or 1,
             "company": emp_data.get("company") or "Employee Dashboard",
-            "last_log_time": (
-                log_details.get("time").strftime("%I:%M %p")
-                if log_details.get("time")
-                else ""
-            ),
             "check_in_with_image": settings.get("check_in_with_image"),
             "check_in_with_location": settings.get("check_in_with_location"),
             "quick_task": settings.get("quick_task"),
             "allow_odometer_reading_input": settings.get(
                 "allow_odometer_reading_input"
             ),
-            "approval_requests":get_workflow_documents(internal=True)
         }
+        dashboard_data.update(
+            get_dashboard_snapshot(
+                emp_data.get("name"),
+                lambda: build_dashboard_snapshot(emp_data.get("name")),
+            )
+        )
+        # read per user, a workflow change would otherwise drop every snapshot
+        dashboard_data["approval_requests"] = get_pending_approval_count()
         dashboard_data["employee_image"] = emp_data.get("image")
         dashboard_data["employee_name"] = emp_data.get("employee_name")
-        get_latest_expense(dashboard_data, emp_data.get("name"))
-        get_latest_ss(dashboard_data, emp_data.get("name"))
-        get_last_log_type(dashboard_data, emp_data.get("name"))
         return gen_response(200, "Dashboard data get successfully", dashboard_data)
 
     except Exception as e:
         return exception_handler(e)
 
 
+def build_dashboard_snapshot(employee):
+    log_details = get_last_log_details(employee)
+    snapshot = {
+        "notice_board": get_notice_board(employee),
+        "latest_expense": {},
+        "latest_salary_slip": {},
+        "last_log_type": log_details.get("log_type"),
+        "last_log_time": (
+            log_details.get("time").strftime("%I:%M %p")
+            if log_details.get("time")
+            else ""
+        ),
+    }
+    get_latest_expense(snapshot, employee)
+    get_latest_ss(snapshot, employee)
+    get_last_log_type(snapshot, employee)
+    return snapshot
+
+
 @frappe.whitelist()
 def get_leave_balance_dashboard():
     try:
@@ -436,10 +501,7 @@ def get_leave_balance_dashboard():
         fiscal_year = get_fiscal_year(nowdate())[0]
         dashboard_data = {"leave_balance": []}
         if fiscal_year:
-            res = get_leave_balance_report(
-                emp_data.get("name"), emp_data.get("company"), fiscal_year
-            )
-            dashboard_data["leave_balance"] = res["result"]
+            dashboard_data["leave_balance"] = get_leave_balance(emp_data.get("name"))
         return gen_response(200, "Leave balance data get successfully", dashboard_data)
     except Exception as e:
         return exception_handler(e)
@@ -515,17 +577,20 @@ def get_attendance_details(emp_data):
     days_off = 0
     absent = 0
     total_present = 0
-    attendance_report = run_attendance_report(
-        emp_data.get("name"), emp_data.get("company")
-    )
-    if attendance_report:
-        days_off = flt(attendance_report.get("total_leaves")) + flt(
-            attendance_report.get("total_holidays")
-        )
-        absent = till_date_days - (
-            flt(days_off) + flt(attendance_report.get("total_present"))
-        )
-        total_present = attendance_report.get("total_present")
+    attendance_summary = get_attendance_summary(emp_data.get("name"), today())
+    if attendance_summary:
+        # the summary counts the holidays of the whole month, the days so far
+        # only cover the ones before today
+        days_off = flt(attendance_summary.get("leave")) + get_holiday_count(
+            emp_data.get("name"), first_date, today()
+        )
+        # leave attendance of coming days is marked in advance
+        absent = max(
+            till_date_days
+            - (flt(days_off) + flt(attendance_summary.get("present"))),
+            0,
+        )
+        total_present = attendance_summary.get("present")
     attendance_details = {
         "month_title": f"{frappe.utils.getdate().strftime('%B')} Details",
         "data": [
@@ -564,18 +629,20 @@ def get_attendance_details(emp_data):
 
 @frappe.whitelist()
 def run_attendance_report(employee, company):
-    filters = {
-        "month": cstr(frappe.utils.getdate().month),
-        "year": cstr(frappe.utils.getdate().year),
-        "company": company,
+    """
+    This month's totals in the shape of the Monthly Attendance Sheet summarized
+    row, served from the attendance summary
+    """
+    frappe.has_permission("Employee", "read", employee, throw=True)
+    attendance_summary = get_attendance_summary(employee, today())
+    return {
         "employee": employee,
-        "summarized_view": 1,
+        "total_present": attendance_summary.get("present"),
+        "total_absent": attendance_summary.get("absent"),
+        "total_leaves": attendance_summary.get("leave"),
+        "total_holidays": attendance_summary.get("holiday"),
+        "total_late_entries": attendance_summary.get("late"),
     }
-    from frappe.desk.query_report import run
-
-    attendance_report = run("Monthly Attendance Sheet", filters=filters)
-    if attendance_report.get("result"):
-        return attendance_report.get("result")[0]
 
 
 def get_latest_leave(dashboard_data, employee):
@@ -603,6 +670,7 @@ def get_latest_expense(dashboard_data, employee):
         filters={"employee": employee},
         fields=["name"],
         order_by="modified desc",
+        limit=1,
     )
     if len(expense_list) >= 1:
         expense_doc = frappe.get_doc("Expense Claim", expense_list[0].name)
@@ -626,8 +694,9 @@ def get_latest_ss(dashboard_data, employee):
     salary_slips = frappe.get_all(
         "Salary Slip",
         filters={"employee": employee},
-        fields=["*"],
+        fields=["name", "posting_date", "gross_pay", "total_working_days"],
         order_by="modified desc",
+        limit=1,
     )
     if len(salary_slips) >= 1:
         month_year = get_month_year_details(salary_slips[0])
@@ -687,16 +756,13 @@ def create_employee_log(
                     return gen_response(400, "Invalid coordinates: latitude must be between -90 and 90, longitude between -180 and 180")
 
                 # Validate geofencing if enabled for branch
-                if branch and branch.latitude and branch.longitude and branch.radius:
-                    distance = calculate_distance(
-                        lat, lng,
-                        float(branch.latitude),
-                        float(branch.longitude)
-                    )
-                    if distance > float(branch.radius):
+                branch_fence = get_geofences("Branch", branch.name) if branch else None
+                if branch_fence:
+                    result = branch_fence.get_results([lat], [lng])[0]
+                    if not result.inside:
                         return gen_response(
                             403,
-                            f"You are {distance:.2f} km away from your branch ({branch.branch}). Please be within {branch.radius} km radius to check in."
+                            f"You are {result.distance:.2f} km away from your branch ({branch.branch}). Please be within {branch.radius} km radius to check in."
                         )
 
                 frappe.logger().info(
@@ -735,6 +801,7 @@ def create_employee_log(
 
                 log_doc.attendance_image = file.get("file_url")
                 log_doc.save(ignore_permissions=True)
+                enqueue_image_processing(file)
 
             except Exception as e:
                 frappe.log_error(
@@ -749,29 +816,174 @@ def create_employee_log(
         return exception_handler(e)
 
 
-def calculate_distance(lat1, lng1, lat2, lng2):
-    """Calculate distance between two points using Haversine formula"""
-    from math import sin, cos, sqrt, atan2, radians
-    
-    # Convert coordinates to radians
-    lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
-    
-    # Calculate distance
-    dlat = lat2 - lat1
-    dlng = lng2 - lng1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    return 6371 * c  # Earth's radius in km
+@frappe.whitelist()
+@ess_validate(methods=["POST"])
+def create_employee_logs(logs):
+    """
+    Offline check-in sync. logs is a list of dicts with client_id, log_type,
+    time and optionally location, latitude, longitude and odometer_reading.
+    Logs already synced (same client_id) are reported as duplicate, the rest
+    are validated, inserted in one transaction and reported per client_id.
+    """
+    try:
+        if isinstance(logs, str):
+            logs = json.loads(logs)
+        if not isinstance(logs, list) or not logs:
+            return gen_response(400, "logs must be a non-empty list")
+        if len(logs) > MAX_CHECKIN_BATCH:
+            return gen_response(
+                400, f"At most {MAX_CHECKIN_BATCH} logs can be synced at once"
+            )
+
+        emp_data = get_employee_by_user(
+            frappe.session.user, fields=["name", "default_shift", "branch", "company"]
+        )
+        branch = frappe.db.get_value(
+            "Branch",
+            {"branch": emp_data.get("branch")},
+            ["branch", "radius", "name"],
+            as_dict=True,
+        )
+        results = validate_employee_logs(
+            logs,
+            emp_data,
+            branch,
+            get_ess_settings().get("check_in_with_location", 0),
+        )
+
+        last_time = None
+        for log, result in zip(logs, results):
+            if result["status"] != "valid":
+                continue
+            frappe.db.savepoint("ess_employee_log")
+            try:
+                log_doc = frappe.get_doc(
+                    {
+                        "doctype": "Employee Checkin",
+                        "employee": emp_data.get("name"),
+                        "log_type": log.get("log_type"),
+                        "time": result.pop("time"),
+                        "location": log.get("location"),
+                        "latitude": log.get("latitude"),
+                        "longitude": log.get("longitude"),
+                        "odometer_reading": log.get("odometer_reading"),
+                        "branch": branch.get("name") if branch else None,
+                        "company": emp_data.get("company"),
+                        "ess_client_id": result["client_id"],
+                    }
+                ).insert(ignore_permissions=True)
+            except frappe.UniqueValidationError:
+                # synced by a concurrent request with the same client_id
+                frappe.db.rollback(save_point="ess_employee_log")
+                frappe.clear_messages()
+                name = frappe.db.get_value(
+                    "Employee Checkin",
+                    {
+                        "employee": emp_data.get("name"),
+                        "ess_client_id": result["client_id"],
+                    },
+                )
+                if name:
+                    result.update(status="duplicate", name=name)
+                else:
+                    result.update(status="failed", message="client_id conflict")
+                continue
+            except Exception as e:
+                frappe.db.rollback(save_point="ess_employee_log")
+                frappe.clear_messages()
+                result.update(status="failed", message=cstr(e))
+                continue
+            result.update(status="created", name=log_doc.name)
+            last_time = max(last_time or log_doc.time, log_doc.time)
+
+        if last_time:
+            record_shift_checkin(emp_data.get("default_shift"), last_time)
+        return gen_response(200, "Employee logs synced successfully", results)
+
+    except Exception as e:
+        return exception_handler(e)
+
+
+def validate_employee_logs(logs, emp_data, branch, require_location):
+    """
+    Result dict per log, status valid, duplicate or failed. Geofence checks of
+    all logs with coordinates run in a single pass.
+    """
+    client_ids = [cstr(log.get("client_id")) for log in logs if log.get("client_id")]
+    synced = {}
+    if client_ids:
+        synced = dict(
+            frappe.get_all(
+                "Employee Checkin",
+                filters={
+                    "employee": emp_data.get("name"),
+                    "ess_client_id": ["in", client_ids],
+                },
+                fields=["ess_client_id", "name"],
+                as_list=1,
+            )
+        )
+
+    results = []
+    located = []
+    seen = set()
+    max_time = add_to_date(now_datetime(), minutes=5)
+    for log in logs:
+        client_id = cstr(log.get("client_id"))
+        log_time = get_log_time(log.get("time"))
+        has_coordinates = (
+            log.get("latitude") is not None and log.get("longitude") is not None
+        )
+        result = {"client_id": client_id, "status": "failed"}
+        if not client_id:
+            result["message"] = "client_id is required"
+        elif client_id in synced or client_id in seen:
+            result.update(status="duplicate", name=synced.get(client_id))
+        elif log.get("log_type") not in ("IN", "OUT"):
+            result["message"] = "log_type must be IN or OUT"
+        elif not log_time or log_time > max_time:
+            result["message"] = "Invalid check-in time"
+        elif require_location and not log.get("location"):
+            result["message"] = "Location is required for check-in"
+        elif has_coordinates and (
+            not (-90 <= flt(log.get("latitude")) <= 90)
+            or not (-180 <= flt(log.get("longitude")) <= 180)
+        ):
+            result["message"] = "Invalid coordinates"
+        else:
+            result.update(status="valid", time=log_time)
+            if has_coordinates:
+                located.append(
+                    (result, flt(log.get("latitude")), flt(log.get("longitude")))
+                )
+        seen.add(client_id)
+        results.append(result)
+
+    branch_fence = get_geofences("Branch", branch.name) if branch else None
+    if branch_fence and located:
+        fence_results = branch_fence.get_results(
+            [lat for result, lat, lng in located],
+            [lng for result, lat, lng in located],
+        )
+        for (result, lat, lng), fence_result in zip(located, fence_results):
+            if not fence_result.inside:
+                result.pop("time")
+                result.update(
+                    status="failed",
+                    message=f"You were {fence_result.distance:.2f} km away from your branch ({branch.branch}). Please be within {branch.radius} km radius to check in.",
+                )
+    return results
+
+
+def get_log_time(value):
+    try:
+        return get_system_datetime(value) if value else None
+    except Exception:
+        return None
 
 
 def update_shift_last_sync(emp_data):
-    if emp_data.get("default_shift"):
-        frappe.db.set_value(
-            "Shift Type",
-            emp_data.get("default_shift"),
-            "last_sync_of_checkin",
-            now_datetime(),
-        )
+    record_shift_checkin(emp_data.get("default_shift"))
 
 
 def get_last_log_type(dashboard_data, employee):
@@ -780,6 +992,7 @@ def get_last_log_type(dashboard_data, employee):
         filters={"employee": employee},
         fields=["log_type"],
         order_by="time desc",
+        limit=1,
     )
 
     if len(logs) >= 1:
@@ -815,48 +1028,15 @@ def create_employee_birthday_board(event_type):
 
 
 def get_employees_having_an_event_today(event_type, date=None):
-    if event_type == "birthday":
-        condition_column = "date_of_birth"
-    elif event_type == "work_anniversary":
-        condition_column = "date_of_joining"
-    else:
-        return
-
-    employees_born_today = frappe.db.multisql(
-        {
-            "mariadb": f"""
-			SELECT `name` as 'emp_id',`personal_email`, `company`, `company_email`, `user_id`, `employee_name` AS 'name', `image`, `date_of_joining`
-			FROM `tabEmployee`
-			WHERE
-				DAY({condition_column}) = DAY(%(today)s)
-			AND
-				MONTH({condition_column}) = MONTH(%(today)s)
-			AND
-				`status` = 'Active'
-		""",
-            "postgres": f"""
-			SELECT "name" AS 'emp_id',"personal_email", "company", "company_email", "user_id", "employee_name" AS 'name', "image"
-			FROM "tabEmployee"
-			WHERE
-				DATE_PART('day', {condition_column}) = date_part('day', %(today)s)
-			AND
-				DATE_PART('month', {condition_column}) = date_part('month', %(today)s)    
-			AND
-				"status" = 'Active'
-		""",
-        },
-        dict(today=getdate(date), condition_column=condition_column),
-        as_dict=1,
-    )
-    return employees_born_today
+    return get_employee_events(event_type, date)
 
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_task_list(start=0, page_length=10, filters=None,today_task=False):
+def get_task_list(start=0, page_length=10, filters=None,today_task=False, cursor=None):
     try:
         filters = update_task_filters(filters,today_task)
-        tasks = frappe.get_list(
+        tasks = get_list_page(
             "Task",
             fields=[
                 "name",
@@ -874,30 +1054,12 @@ def get_task_list(start=0, page_length=10, filters=None,today_task=False):
             filters=filters,
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
         )
         for task in tasks:
-            # if frappe.session.user == task.get("assigned_by") or frappe.session.user == task.get("completed_by") or (task.get("assigned_to") and frappe.session.user in task.get("assigned_to")):
             if task["exp_end_date"]:
                 task["exp_end_date"] = task["exp_end_date"].strftime("%d %b %Y")
-            get_task_comments(task)
-            task["project_name"] = frappe.db.get_value(
-                "Project", {"name": task.get("project")}, ["project_name"]
-            )
-            get_task_assigned_by(task)
-            if task.get("assigned_to"):
-                task["assigned_to"] = frappe.get_all(
-                    "User",
-                    filters=[
-                        ["User", "email", "in", json.loads(task.get("assigned_to"))]
-                    ],
-                    fields=["full_name as user", "user_image"],
-                    order_by="creation asc",
-                )
-            else:
-                task["assigned_to"] = []
-                # updated_task.append(task)
-
+        enrich_tasks(tasks)
         return gen_response(200, "Task list getting Successfully", tasks)
     except Exception as e:
         return exception_handler(e)
@@ -909,20 +1071,22 @@ def update_task_filters(filters,today_task):
         filters.append(["Task","exp_end_date","=",today()])
     return filters
 
-def get_task_assigned_by(task):
-    task["assigned_by"] = frappe.db.get_value(
-        "User",
-        {"name": task.get("assigned_by")},
-        ["full_name as user", "user_image"],
-        as_dict=1,
-    )
-
+def enrich_tasks(tasks, detailed=False):
+    """
+    Attach comments, project name and user profiles to a page of task rows.
+    Everything is resolved with a fixed number of bulk queries (comments,
+    projects, users) and stitched together in memory.
+    """
+    if not tasks:
+        return tasks
 
-def get_task_comments(task):
-    comments = frappe.get_all(
+    task_names = [task.get("name") for task in tasks]
+    comments_by_task = {}
+    for comment in frappe.get_all(
         "Comment",
         filters={
-            "reference_name": ["like", "%{0}%".format(task.get("name"))],
+            "reference_doctype": "Task",
+            "reference_name": ["in", task_names],
             "comment_type": "Comment",
         },
         fields=[
@@ -932,17 +1096,78 @@ def get_task_comments(task):
             "creation",
             "comment_email",
         ],
-    )
-    for comment in comments:
-        comment["commented"] = pretty_date(comment["creation"])
-        comment["creation"] = comment["creation"].strftime("%I:%M %p")
-        user_image = frappe.get_value(
-            "User", comment.comment_email, "user_image", cache=True
+    ):
+        comments_by_task.setdefault(comment.reference_name, []).append(comment)
+
+    project_names = {}
+    projects = {task.get("project") for task in tasks if task.get("project")}
+    if projects:
+        project_names = dict(
+            frappe.get_all(
+                "Project",
+                filters={"name": ["in", list(projects)]},
+                fields=["name", "project_name"],
+                as_list=1,
+            )
         )
-        comment["user_image"] = user_image
 
-    task["comments"] = comments
-    task["num_comments"] = len(comments)
+    emails = set()
+    for task in tasks:
+        task["assigned_to"] = (
+            json.loads(task.get("assigned_to")) if task.get("assigned_to") else []
+        )
+        emails.update(task["assigned_to"])
+        emails.add(task.get("assigned_by"))
+        emails.add(task.get("completed_by"))
+        for comment in comments_by_task.get(task.get("name"), []):
+            emails.add(comment.comment_email)
+    emails.discard(None)
+
+    users = {}
+    if emails:
+        for user in frappe.get_all(
+            "User",
+            filters={"name": ["in", list(emails)]},
+            fields=["name", "full_name", "user_image"],
+            order_by="creation asc",
+        ):
+            users[user.name] = user
+
+    for task in tasks:
+        task["project_name"] = project_names.get(task.get("project"))
+        task["assigned_by"] = get_task_user_profile(
+            users.get(task.get("assigned_by")), detailed
+        )
+        if "completed_by" in task:
+            task["completed_by"] = get_task_user_profile(
+                users.get(task.get("completed_by")), detailed
+            )
+        assigned_to = set(task["assigned_to"])
+        task["assigned_to"] = [
+            get_task_user_profile(user, detailed)
+            for email, user in users.items()
+            if email in assigned_to
+        ]
+
+        comments = comments_by_task.get(task.get("name"), [])
+        for comment in comments:
+            comment["commented"] = pretty_date(comment["creation"])
+            comment["creation"] = comment["creation"].strftime("%I:%M %p")
+            comment["user_image"] = (users.get(comment.comment_email) or {}).get(
+                "user_image"
+            )
+        task["comments"] = comments
+        task["num_comments"] = len(comments)
+    return tasks
+
+
+def get_task_user_profile(user, detailed=False):
+    if not user:
+        return None
+    profile = {"user": user.full_name, "user_image": user.user_image}
+    if detailed:
+        profile.update({"name": user.name, "full_name": user.full_name})
+    return profile
 
 
 def validate_assign_task(task_id):
@@ -1077,53 +1302,7 @@ def get_task_list_dashboard():
         for task in tasks:
             if task["exp_end_date"]:
                 task["exp_end_date"] = task["exp_end_date"].strftime("%d %b %Y")
-            comments = frappe.get_all(
-                "Comment",
-                filters={
-                    "reference_name": ["like", "%{0}%".format(task.get("name"))],
-                    "comment_type": "Comment",
-                },
-                fields=[
-                    "content as comment",
-                    "comment_by",
-                    "reference_name",
-                    "creation",
-                    "comment_email",
-                ],
-            )
-
-            project_name = frappe.db.get_value(
-                "Project", {"name": task.get("project")}, ["project_name"]
-            )
-            task["project_name"] = project_name
-
-            assigned_by = frappe.db.get_value(
-                "User",
-                {"name": task.get("assigned_by")},
-                ["full_name as user", "user_image"],
-                as_dict=1,
-            )
-            task["assigned_by"] = assigned_by
-
-            for comment in comments:
-                comment["commented"] = pretty_date(comment["creation"])
-                comment["creation"] = comment["creation"].strftime("%I:%M %p")
-                user_image = frappe.get_value(
-                    "User", comment.comment_email, "user_image", cache=True
-                )
-                comment["user_image"] = user_image
-
-            assigned_to = frappe.get_all(
-                "User",
-                filters=[["User", "email", "in", json.loads(task.get("assigned_to"))]],
-                fields=["full_name as user", "user_image"],
-                order_by="creation asc",
-            )
-
-            task["assigned_to"] = assigned_to
-
-            task["comments"] = comments
-            task["num_comments"] = len(comments)
+        enrich_tasks(tasks)
 
         return gen_response(200, "Task list get successfully", tasks)
     except Exception as e:
@@ -1137,74 +1316,89 @@ def get_attendance_list(year=None, month=None):
         if not year or not month:
             return gen_response(500, "year and month is required", [])
         emp_data = get_employee_by_user(frappe.session.user)
-        present_count = 0
-        absent_count = 0
-        late_count = 0
-
-        employee_attendance_list = frappe.get_all(
-            "Attendance",
-            filters={
-                "employee": emp_data.get("name"),
-                "attendance_date": [
-                    "between",
-                    [
-                        f"{int(year)}-{int(month)}-01",
-                        f"{int(year)}-{int(month)}-{calendar.monthrange(int(year), int(month))[1]}",
-                    ],
-                ],
-            },
-            fields=[
-                "name",
-                "DATE_FORMAT(attendance_date, '%d %W') AS attendance_date",
-                "status",
-                "working_hours",
-                "in_time",
-                "out_time",
-                "late_entry",
-            ],
+        attendance_data = get_cached_attendance_list(
+            emp_data.get("name"),
+            year,
+            month,
+            lambda: build_attendance_list(emp_data.get("name"), int(year), int(month)),
         )
-
-        if not employee_attendance_list:
+        if not attendance_data["attendance_list"]:
             return gen_response(500, "no attendance found for this year and month", [])
+        return gen_response(
+            200, "Attendance data getting successfully", attendance_data
+        )
 
-        for attendance in employee_attendance_list:
-            employee_checkin_details = frappe.get_all(
-                "Employee Checkin",
-                filters={"attendance": attendance.get("name")},
-                fields=["log_type", "time_format(time, '%h:%i%p') as time"],
+    except Exception as e:
+        return exception_handler(e)
+
+
+def build_attendance_list(employee, year, month):
+    days_in_month = calendar.monthrange(year, month)[1]
+    employee_attendance_list = frappe.get_all(
+        "Attendance",
+        filters={
+            "employee": employee,
+            "attendance_date": [
+                "between",
+                [f"{year}-{month}-01", f"{year}-{month}-{days_in_month}"],
+            ],
+        },
+        fields=[
+            "name",
+            "attendance_date",
+            "status",
+            "working_hours",
+            "in_time",
+            "out_time",
+            "late_entry",
+        ],
+    )
+
+    # all checkins of the month in one query, grouped by attendance
+    checkins = {}
+    if employee_attendance_list:
+        for checkin in frappe.get_all(
+            "Employee Checkin",
+            filters={
+                "attendance": [
+                    "in",
+                    [attendance.name for attendance in employee_attendance_list],
+                ]
+            },
+            fields=["attendance", "log_type", "time"],
+            order_by="time asc",
+        ):
+            checkins.setdefault(checkin.attendance, []).append(
+                {"log_type": checkin.log_type, "time": checkin.time.strftime("%I:%M%p")}
             )
 
-            attendance["employee_checkin_detail"] = employee_checkin_details
+    present_count = absent_count = late_count = 0
+    for attendance in employee_attendance_list:
+        attendance["attendance_date"] = attendance.attendance_date.strftime("%d %A")
+        attendance["employee_checkin_detail"] = checkins.get(attendance.name, [])
 
-            if attendance["status"] == "Present":
-                present_count += 1
+        if attendance["status"] == "Present":
+            present_count += 1
 
-                if attendance["late_entry"] == 1:
-                    late_count += 1
+            if attendance["late_entry"] == 1:
+                late_count += 1
 
-            elif attendance["status"] == "Absent":
-                absent_count += 1
+        elif attendance["status"] == "Absent":
+            absent_count += 1
 
-            del attendance["name"]
-            del attendance["status"]
-            del attendance["late_entry"]
+        del attendance["name"]
+        del attendance["status"]
+        del attendance["late_entry"]
 
-        attendance_details = {
-            "days_in_month": calendar.monthrange(int(year), int(month))[1],
+    return {
+        "attendance_details": {
+            "days_in_month": days_in_month,
             "present": present_count,
             "absent": absent_count,
             "late": late_count,
-        }
-        attendance_data = {
-            "attendance_details": attendance_details,
-            "attendance_list": employee_attendance_list,
-        }
-        return gen_response(
-            200, "Attendance data getting successfully", attendance_data
-        )
-
-    except Exception as e:
-        return exception_handler(e)
+        },
+        "attendance_list": employee_attendance_list,
+    }
 
 
 @frappe.whitelist()
@@ -1329,6 +1523,7 @@ def upload_documents():
 
         ess_document.attachement = file_doc.file_url
         ess_document.save()
+        enqueue_image_processing(file_doc)
 
         return gen_response(200, "Document added successfully")
     except Exception as e:
@@ -1336,8 +1531,11 @@ def upload_documents():
 
 
 def get_file_size(file_path, unit="auto"):
-    file_size = os.path.getsize(file_path)
+    return format_file_size(os.path.getsize(file_path), unit=unit)
 
+
+def format_file_size(file_size, unit="auto"):
+    file_size = flt(file_size)
     units = ["B", "Kb", "Mb", "Gb", "Tb"]
     if unit == "auto":
         unit_index = 0
@@ -1357,35 +1555,48 @@ def get_file_size(file_path, unit="auto"):
 @ess_validate(methods=["GET"])
 def document_list():
     try:
-        from frappe.utils.file_manager import get_file_path
-
         emp_data = get_employee_by_user(frappe.session.user)
-        documents = frappe.get_all(
-            "ESS Documents",
-            filters={
-                "employee_no": emp_data.get("name"),
-            },
-            fields=["name", "attachement"],
+        documents = frappe.db.sql(
+            """SELECT document.name, document.attachement,
+            file.name AS file_id, file.file_name, file.file_size,
+            file.is_private, file.thumbnail_url
+            FROM `tabESS Documents` document
+            LEFT JOIN `tabFile` file
+            ON file.file_url = document.attachement
+            AND file.attached_to_doctype = 'ESS Documents'
+            AND file.attached_to_name = document.name
+            WHERE document.employee_no = %(employee)s
+            ORDER BY document.modified DESC""",
+            {"employee": emp_data.get("name")},
+            as_dict=1,
         )
 
         if documents:
+            missing_sizes = []
             for doc in documents:
-                file = frappe.get_value(
-                    "File",
-                    {
-                        "file_url": doc.get("attachement"),
-                        "attached_to_doctype": "ESS Documents",
-                        "attached_to_name": doc.get("name"),
-                    },
-                    ["name", "file_name", "file_size"],
-                    as_dict=1,
+                file_id = doc.pop("file_id")
+                is_private = doc.pop("is_private")
+                file_size = doc.pop("file_size")
+                if not file_id:
+                    doc.pop("file_name")
+                    doc.pop("thumbnail_url")
+                    continue
+                if file_size is None:
+                    # unknown until the background job has measured it
+                    missing_sizes.append(file_id)
+                    doc["file_size"] = None
+                else:
+                    doc["file_size"] = format_file_size(file_size)
+                doc["file_id"] = file_id
+                doc["download_url"] = (
+                    get_download_url(file_id) if is_private else doc.attachement
+                )
+            if missing_sizes:
+                frappe.enqueue(
+                    "employee_self_service.mobile.v1.file.backfill_file_sizes",
+                    queue="short",
+                    file_ids=missing_sizes,
                 )
-                if file:
-                    doc["file_name"] = file.get("file_name")
-                    doc["file_size"] = get_file_size(
-                        (get_file_path(file.get("file_name"))), unit="auto"
-                    )
-                    doc["file_id"] = file.get("name")
 
             return gen_response(200, "Documents get successfully", documents)
         else:
@@ -1496,24 +1707,31 @@ def upcoming_activity(date=None):
             upcoming_data[date].extend(notice_board)
 
         birthday = get_employees_having_an_event_today("birthday", date=date)
+        work_anniversary = get_employees_having_an_event_today(
+            "work_anniversary", date=date
+        )
+        thumbnails = get_thumbnail_urls(
+            employee.get("image") for employee in birthday + work_anniversary
+        )
         for birthdate in birthday:
             upcoming_data[date].append(
                 {
                     "title": f"{birthdate.get('name')}'s Birthday",
                     "description": birthdate.get("name"),
-                    "image": birthdate.get("image"),
+                    "image": thumbnails.get(
+                        birthdate.get("image"), birthdate.get("image")
+                    ),
                 }
             )
 
-        work_anniversary = get_employees_having_an_event_today(
-            "work_anniversary", date=date
-        )
         for anniversary in work_anniversary:
             upcoming_data[date].append(
                 {
                     "title": f"{anniversary.get('name')}'s work anniversary",
                     "description": anniversary.get("name"),
-                    "image": anniversary.get("image"),
+                    "image": thumbnails.get(
+                        anniversary.get("image"), anniversary.get("image")
+                    ),
                 }
             )
         holidays = holiday_list(date=date)
@@ -1606,59 +1824,81 @@ def notification_list():
 
 
 def send_notification_on_event():
-    birthday_events = get_employees_having_an_event_today("birthday", date=today())
-    for event in birthday_events:
-        create_push_notification(
-            title=f"{event.get('name')}'s Birthday",
-            message=f"Wish happy birthday to {event['name']}",
-            send_for="All User",
-            notification_type="event",
+    start_time = time.monotonic()
+    notifications = []
+    for event in get_employees_having_an_event_today("birthday", date=today()):
+        notifications.append(
+            dict(
+                title=f"{event.get('name')}'s Birthday",
+                message=f"Wish happy birthday to {event['name']}",
+                send_for="All User",
+                notification_type="event",
+            )
         )
 
-    anniversary_events = get_employees_having_an_event_today(
+    for anniversary in get_employees_having_an_event_today(
         "work_anniversary", date=today()
-    )
-    for anniversary in anniversary_events:
-        create_push_notification(
-            title=f"{anniversary.get('name')}' s Work Anniversary",
-            message=f"Wish work anniversary {anniversary['name']}",
-            send_for="All User",
-            notification_type="event",
+    ):
+        notifications.append(
+            dict(
+                title=f"{anniversary.get('name')}' s Work Anniversary",
+                message=f"Wish work anniversary {anniversary['name']}",
+                send_for="All User",
+                notification_type="event",
+            )
         )
+    # every "All User" notification reuses the same token list in one job
+    create_push_notifications(notifications)
+    log_event_notification_run("send_notification_on_event", notifications, start_time)
 
 
 def global_holiday_list(date=None):
-    global_company = frappe.db.get_single_value("Global Defaults", "default_company")
-    employee_holiday_list = frappe.get_all(
-        "Employee",
-        {"company": global_company, "holiday_list": ("!=", "")},
-        ["employee", "holiday_list", "user_id"],
+    """Employees having a holiday on the given date, in a single Employee/Holiday join"""
+    global_company = get_global_defaults().get("default_company")
+    return frappe.db.sql(
+        """SELECT 'holiday' AS title,
+        holiday.description,
+        holiday.parent AS holiday_list,
+        employee.user_id
+        FROM `tabEmployee` employee
+        INNER JOIN `tabHoliday` holiday ON holiday.parent = employee.holiday_list
+        WHERE employee.company = %(company)s
+        AND IFNULL(employee.holiday_list, '') != ''
+        AND IFNULL(employee.user_id, '') != ''
+        AND holiday.holiday_date = %(date)s""",
+        {"company": global_company, "date": getdate(date)},
+        as_dict=1,
     )
-    holidays = []
-    for employee in employee_holiday_list:
-        filters = [
-            ["Holiday", "holiday_date", "=", getdate(date)],
-            ["Holiday", "parent", "=", employee.holiday_list],
-        ]
-        holidays_list = frappe.get_all(
-            "Holiday", filters=filters, fields=["'holiday' as title", "description"]
-        )
-        for holiday in holidays_list:
-            holiday["user_id"] = employee.user_id
-            holidays.append(holiday)
-    return holidays
 
 
 def on_holiday_event():
-    holiday_list = global_holiday_list(date=today())
-    for holiday in holiday_list:
-        create_push_notification(
-            title=f"{holiday.get('title')}",
-            message=f"{holiday.get('description')}",
-            send_for="Single User",
-            user=holiday.get("user_id"),
+    start_time = time.monotonic()
+    holiday_groups = {}
+    for holiday in global_holiday_list(date=today()):
+        holiday_groups.setdefault(
+            (holiday.holiday_list, holiday.title, holiday.description), []
+        ).append(holiday.user_id)
+
+    # one Multiple User notification, i.e. one multicast, per holiday list
+    notifications = [
+        dict(
+            title=f"{title}",
+            message=f"{description}",
+            send_for="Multiple User",
+            users=[dict(user=user) for user in set(users)],
             notification_type="Holiday",
         )
+        for (holiday_list, title, description), users in holiday_groups.items()
+    ]
+    create_push_notifications(notifications)
+    log_event_notification_run("on_holiday_event", notifications, start_time)
+
+
+def log_event_notification_run(job, notifications, start_time):
+    frappe.logger().info(
+        f"{job}: queued {len(notifications)} push notifications in "
+        f"{time.monotonic() - start_time:.2f}s"
+    )
 
 
 @frappe.whitelist()
@@ -1777,54 +2017,7 @@ def get_task_by_id(task_id=None):
         if not tasks:
             return gen_response(500, "you have not task with this task id", [])
 
-        tasks["assigned_by"] = frappe.db.get_value(
-            "User",
-            {"name": tasks.get("assigned_by")},
-            ["name", "full_name as user", "full_name", "user_image"],
-            as_dict=1,
-        )
-        tasks["completed_by"] = frappe.db.get_value(
-            "User",
-            {"name": tasks.get("completed_by")},
-            ["name", "full_name as user", "full_name", "user_image"],
-            as_dict=1,
-        )
-        tasks["project_name"] = frappe.db.get_value(
-            "Project", {"name": tasks.get("project")}, ["project_name"]
-        )
-
-        if tasks.get("assigned_to"):
-            tasks["assigned_to"] = frappe.get_all(
-                "User",
-                filters=[["User", "email", "in", json.loads(tasks.get("assigned_to"))]],
-                fields=["name", "full_name as user", "full_name", "user_image"],
-                order_by="creation asc",
-            )
-
-        comments = frappe.get_all(
-            "Comment",
-            filters={
-                "reference_name": ["like", "%{0}%".format(tasks.get("name"))],
-                "comment_type": "Comment",
-            },
-            fields=[
-                "content as comment",
-                "comment_by",
-                "reference_name",
-                "creation",
-                "comment_email",
-            ],
-        )
-
-        for comment in comments:
-            comment["commented"] = pretty_date(comment["creation"])
-            comment["creation"] = comment["creation"].strftime("%I:%M %p")
-            comment["user_image"] = frappe.get_value(
-                "User", comment.comment_email, "user_image", cache=True
-            )
-
-        tasks["comments"] = comments
-        tasks["num_comments"] = len(comments)
+        enrich_tasks([tasks], detailed=True)
 
         return gen_response(200, "Task", tasks)
     except frappe.PermissionError:
@@ -1899,6 +2092,7 @@ def update_profile_picture():
                 "user_image",
                 employee_profile_picture.file_url,
             )
+        enqueue_image_processing(employee_profile_picture)
         return gen_response(200, "Employee profile picture updated successfully")
     except Exception as e:
         return exception_handler(e)
@@ -1920,6 +2114,8 @@ def get_transactions(
         if not party:
             emp_data = get_employee_by_user(frappe.session.user)
             party = [emp_data.get("name")]
+        elif isinstance(party, str):
+            party = frappe.parse_json(party) if party.startswith("[") else [party]
         allowed_party_types = ["Employee", "Customer"]
 
         if party_type not in allowed_party_types:
@@ -1949,95 +2145,23 @@ def get_transactions(
                 ", ".join(party) if party and len(party) > 0 else ""
             )
 
-        from frappe.desk.query_report import run
-
-        res = run("General Ledger", filters=filters_report, ignore_prepared_report=True)
-        data = []
-        total = {}
-        opening_balance = {}
-        if res.get("result"):
-            for row in res.get("result"):
-                if "gl_entry" in row.keys():
-                    data.append(
-                        {
-                            "posting_date": row.get("posting_date").strftime(
-                                "%d-%m-%Y"
-                            ),
-                            "voucher_type": row.get("voucher_type"),
-                            "voucher_no": row.get("voucher_no"),
-                            "debit": fmt_money(
-                                row.get("debit"),
-                                currency=global_defaults.get("default_currency"),
-                            ),
-                            "credit": fmt_money(
-                                row.get("credit"),
-                                currency=global_defaults.get("default_currency"),
-                            ),
-                            "balance": fmt_money(
-                                row.get("balance"),
-                                currency=global_defaults.get("default_currency"),
-                            ),
-                            "party_type": row.get("party_type"),
-                            "party": row.get("party"),
-                        }
-                    )
-
-                    if flt(row.get("balance")) >= 0:
-                        row["color"] = "red"
-                    else:
-                        row["color"] = "green"
-                if "'Opening'" in row.values():
-                    opening_balance = {
-                        "account": "Opening",
-                        "posting_date": from_date.strftime("%d-%m-%Y"),
-                        "credit": fmt_money(
-                            row.get("credit"),
-                            currency=global_defaults.get("default_currency"),
-                        ),
-                        "debit": fmt_money(
-                            row.get("debit"),
-                            currency=global_defaults.get("default_currency"),
-                        ),
-                        "balance": fmt_money(
-                            row.get("balance"),
-                            currency=global_defaults.get("default_currency"),
-                        ),
-                    }
-                if "'Total'" in row.values():
-                    total = {
-                        "account": "Total",
-                        "posting_date": to_date.strftime("%d-%m-%Y"),
-                        "credit": fmt_money(
-                            row.get("credit"),
-                            currency=global_defaults.get("default_currency"),
-                        ),
-                        "debit": fmt_money(
-                            row.get("debit"),
-                            currency=global_defaults.get("default_currency"),
-                        ),
-                        "balance": fmt_money(
-                            row.get("balance"),
-                            currency=global_defaults.get("default_currency"),
-                        ),
-                    }
-            data.insert(0, opening_balance)
-            data.append(total)
-
-            from frappe.utils.print_format import report_to_pdf
-
-            if download == "true":
-                html = frappe.render_template(
-                    "employee_self_service/templates/employee_statement.html",
-                    {
-                        "data": data,
-                        "filters": filters_report,
-                        "user": frappe.db.get_value(
-                            "User", frappe.session.user, "full_name"
-                        ),
-                    },
-                    is_path=True,
-                )
-                return report_to_pdf(html)
+        if not frappe.get_cached_doc("Report", "General Ledger").is_permitted():
+            raise frappe.PermissionError
+
+        data, job_id = get_statement(
+            company=filters_report["company"],
+            party_type=party_type,
+            parties=party,
+            from_date=from_date,
+            to_date=to_date,
+            currency=global_defaults.get("default_currency"),
+            filters=filters_report,
+        )
+        if job_id:
+            # long ranges are built in the background, poll get_transactions_job
+            return gen_response(202, "Statement is being prepared", {"job_id": job_id})
+        if download == "true":
+            return download_statement(data, filters_report)
         return gen_response(200, "Ledger Get Successfully", data)
     except frappe.PermissionError:
         return gen_response(500, "Not permitted general ledger report")
@@ -2045,6 +2169,39 @@ def get_transactions(
         return exception_handler(e)
 
 
+@frappe.whitelist()
+@ess_validate(methods=["GET"])
+def get_transactions_job(job_id, download="false"):
+    try:
+        job = get_statement_job(job_id)
+        if not job:
+            return gen_response(500, "Invalid job id")
+        if job["status"] == "Failed":
+            return gen_response(500, "Statement could not be prepared")
+        if job["status"] != "Completed" or job.get("data") is None:
+            return gen_response(202, "Statement is being prepared", {"job_id": job_id})
+        if download == "true":
+            return download_statement(job["data"], job.get("filters"))
+        return gen_response(200, "Ledger Get Successfully", job["data"])
+    except Exception as e:
+        return exception_handler(e)
+
+
+def download_statement(data, filters):
+    from frappe.utils.print_format import report_to_pdf
+
+    html = frappe.render_template(
+        "employee_self_service/templates/employee_statement.html",
+        {
+            "data": data,
+            "filters": filters,
+            "user": frappe.db.get_value("User", frappe.session.user, "full_name"),
+        },
+        is_path=True,
+    )
+    return report_to_pdf(html)
+
+
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
 def get_customer_list(start=0, page_length=10, filters=None):
@@ -8,8 +8,9 @@ from employee_self_service.mobile.v1.api_utils import (
     ess_validate,
     exception_handler,
     get_employee_by_user,
-    remove_default_fields,
+    get_list_page,
 )
+from employee_self_service.mobile.v1.image_processing import get_thumbnail_urls
 
 
 @frappe.whitelist()
@@ -31,75 +32,139 @@ def ess_post(**data):
         return exception_handler(e)
 
 
+POST_FIELDS = [
+    "name",
+    "user",
+    "user_image",
+    "employee",
+    "full_name",
+    "designation",
+    "post_datetime",
+    "publish",
+    "post_content",
+    "post_type",
+    "poll_duration",
+    "poll_start_date",
+    "poll_end_date",
+    "_liked_by",
+]
+CHILD_FIELDS = ["name", "parent", "parentfield", "parenttype"]
+
+
 def get_ess_post(post_name):
-    post_details = json.loads(frappe.get_doc("ESS Post", post_name).as_json())
-    post_details = remove_default_fields(post_details)
-    # post_details["comments"] = get_comments(
-    #     post.get("name"), limit=2, internal=True
-    # )
-    post_details["comments_count"] = frappe.db.count(
-        "Comment",
-        {
-            "reference_doctype": "ESS Post",
-            "reference_name": post_name,
-            "comment_type": "Comment",
-        },
+    posts = get_ess_posts(filters=[["name", "=", post_name]])
+    return posts[0] if posts else None
+
+
+def get_ess_posts(filters, start=0, page_length=None, cursor=None):
+    """
+    Load a page of posts with everything the feed shows. Child tables,
+    comment counts and liker profiles are fetched in bulk, so the number of
+    queries does not depend on the page size.
+    """
+    posts = get_list_page(
+        "ESS Post",
+        fields=POST_FIELDS,
+        filters=filters,
+        start=start,
+        page_length=page_length,
+        cursor=cursor,
+        sort_field="post_datetime",
+        list_method=frappe.get_all,
     )
-    if post_details.get("_liked_by"):
-        post_details["likes_count"] = len(json.loads(post_details["_liked_by"]))
-        likes_list = json.loads(post_details["_liked_by"])
-        if frappe.session.user in likes_list:
-            post_details["liked_by_me"] = True
-        else:
-            post_details["liked_by_me"] = False
+    if not posts:
+        return []
+    post_names = [post.name for post in posts]
 
-        post_details["_liked_by"] = frappe.get_all(
-            "User",
-            filters=[["name", "in", likes_list]],
-            fields=["name", "full_name", "user_image"],
+    attachments = get_post_child_rows(
+        "ESS Post Attachment", post_names, ["post_attach", "type_of_attchment"]
+    )
+    poll_options = get_post_child_rows(
+        "ESS Post Poll Options", post_names, ["option", "num_of_vote", "percentage"]
+    )
+    poll_logs = get_post_child_rows("ESS Post Poll Log", post_names, ["user", "answer"])
+    comments_count = dict(
+        frappe.get_all(
+            "Comment",
+            filters={
+                "reference_doctype": "ESS Post",
+                "reference_name": ["in", post_names],
+                "comment_type": "Comment",
+            },
+            fields=["reference_name", "count(name) as comments_count"],
+            group_by="reference_name",
+            as_list=1,
         )
+    )
 
-    else:
-        post_details["likes_count"] = 0
-        post_details["liked_by_me"] = False
-    if post_details.get("post_type") == "Poll":
-        post_details["my_vote"] = frappe.db.get_value(
-            "ESS Post Poll Log",
-            {"user": frappe.session.user, "parent": post_details.get("name")},
-            "answer",
-        )
-        post_details["total_vote"] = len(post_details.get("ess_post_poll_log"))
-        
-    if frappe.session.user != post_details.get('user'):
-        del post_details["ess_post_poll_log"]
-    else:
-        for poll_log in post_details["ess_post_poll_log"]:
-            remove_default_fields(poll_log)
-        
-    return post_details
+    liked_by = {
+        post.name: json.loads(post._liked_by) if post._liked_by else []
+        for post in posts
+    }
+    likers = get_user_profiles({user for users in liked_by.values() for user in users})
+
+    for post in posts:
+        post["ess_post_attachment"] = attachments.get(post.name, [])
+        post["ess_post_poll_options"] = poll_options.get(post.name, [])
+        post["comments_count"] = comments_count.get(post.name, 0)
+        post["likes_count"] = len(liked_by[post.name])
+        post["liked_by_me"] = frappe.session.user in liked_by[post.name]
+        if post._liked_by:
+            post["_liked_by"] = [
+                likers[user] for user in liked_by[post.name] if user in likers
+            ]
+
+        logs = poll_logs.get(post.name, [])
+        if post.post_type == "Poll":
+            post["my_vote"] = next(
+                (log.answer for log in logs if log.user == frappe.session.user), None
+            )
+            post["total_vote"] = len(logs)
+        # only the author sees who voted for what
+        if frappe.session.user == post.user:
+            post["ess_post_poll_log"] = logs
+    return posts
+
+
+def get_user_profiles(users):
+    """Name, full name and user image of the users, thumbnails where available"""
+    if not users:
+        return {}
+    profiles = frappe.get_all(
+        "User",
+        filters=[["name", "in", list(users)]],
+        fields=["name", "full_name", "user_image"],
+    )
+    thumbnails = get_thumbnail_urls(user.user_image for user in profiles)
+    for user in profiles:
+        user.user_image = thumbnails.get(user.user_image, user.user_image)
+    return {user.name: user for user in profiles}
+
+
+def get_post_child_rows(doctype, post_names, fields):
+    rows = {}
+    for row in frappe.get_all(
+        doctype,
+        filters={"parenttype": "ESS Post", "parent": ["in", post_names]},
+        fields=CHILD_FIELDS + fields,
+        order_by="idx asc",
+    ):
+        rows.setdefault(row.parent, []).append(row)
+    return rows
 
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_feed(my_post=False, start=0, page_length=10):
+def get_feed(my_post=False, start=0, page_length=10, cursor=None):
     try:
         filters = []
         if my_post:
             filters.append(["user", "=", frappe.session.user])
         else:
             filters.append(["publish", "=", 1])
-        posts = frappe.get_all(
-            "ESS Post",
-            filters=filters,
-            fields=["name"],
-            start=start,
-            page_length=page_length,
-            order_by="post_datetime desc",
+        feed_details = get_ess_posts(
+            filters=filters, start=start, page_length=page_length, cursor=cursor
         )
-        feed_details = []
-        for post in posts:
-            post_details = get_ess_post(post_name=post.name)
-            feed_details.append(post_details)
         return gen_response(200, "post details get successfully", feed_details)
     except Exception as e:
         return exception_handler(e)
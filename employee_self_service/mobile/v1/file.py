@@ -1,11 +1,21 @@
+import hashlib
+import hmac
+import os
+import time
+from urllib.parse import urlencode
+
 import frappe
 from frappe import _
 from frappe.handler import upload_file
+from frappe.utils import cint, cstr
 from employee_self_service.mobile.v1.api_utils import (
     exception_handler,
     ess_validate,
     gen_response,
 )
+from employee_self_service.mobile.v1.image_processing import enqueue_image_processing
+
+DOWNLOAD_URL_TTL = 60 * 60
 
 
 @frappe.whitelist()
@@ -21,6 +31,7 @@ def upload_documents():
             file_doc.attached_to_doctype = frappe.form_dict.reference_doctype
             file_doc.attached_to_name = frappe.form_dict.reference_docname
             file_doc.save(ignore_permissions=True)
+            enqueue_image_processing(file_doc)
             frappe.db.commit()
             return gen_response(200, "file added successfully.")
         else:
@@ -39,3 +50,63 @@ def get_attchment(reference_doctype, reference_name):
         },
         fields=["*"],
     )
+
+
+def backfill_file_sizes(file_ids):
+    """Store the size of Files saved without one, files missing on disk stay unknown"""
+    for file_id in file_ids:
+        file_doc = frappe.get_doc("File", file_id)
+        if file_doc.file_size is not None:
+            continue
+        try:
+            file_size = os.path.getsize(file_doc.get_full_path())
+        except OSError:
+            continue
+        file_doc.db_set("file_size", file_size, update_modified=False)
+
+
+def get_download_signature(file_id, expires):
+    from frappe.utils.password import get_encryption_key
+
+    return hmac.new(
+        get_encryption_key().encode(),
+        f"{file_id}|{expires}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def get_download_url(file_id):
+    """Signed link to download_file, valid for DOWNLOAD_URL_TTL seconds"""
+    expires = cint(time.time()) + DOWNLOAD_URL_TTL
+    return "/api/method/employee_self_service.mobile.v1.file.download_file?" + (
+        urlencode(
+            {
+                "file_id": file_id,
+                "expires": expires,
+                "signature": get_download_signature(file_id, expires),
+            }
+        )
+    )
+
+
+@frappe.whitelist(allow_guest=True)
+@ess_validate(methods=["GET"])
+def download_file(file_id, expires, signature):
+    """
+    Streams a private file for a link made by get_download_url, without
+    reading it into memory (or through nginx when X-Accel-Redirect is set up)
+    """
+    try:
+        from frappe.utils.response import send_private_file
+
+        if cint(expires) < time.time() or not hmac.compare_digest(
+            get_download_signature(file_id, cint(expires)), cstr(signature)
+        ):
+            return gen_response(403, _("This download link is invalid or expired"))
+
+        file_url = frappe.db.get_value("File", file_id, "file_url")
+        if not file_url or not file_url.startswith("/private/"):
+            return gen_response(404, _("File not found"))
+        return send_private_file(file_url[len("/private/") :])
+    except Exception as e:
+        return exception_handler(e)
@@ -0,0 +1,196 @@
+import frappe
+import numpy as np
+from frappe.utils import flt
+
+"""
+Vectorized geofence evaluation.
+
+Every Office Geofencing record and every Branch with coordinates is a circular
+fence (radius in km). A batch of points is evaluated against all fences with
+NumPy: a per-fence bounding box rejects distant points cheaply, exact haversine
+distances are only computed for the remaining candidates, and the nearest
+fence of every point is picked from an equirectangular approximation.
+"""
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+FENCE_CACHE_KEY = "ess_geofences"
+# points evaluated per NumPy pass, keeps the (points x fences) arrays small
+POINT_CHUNK_SIZE = 2000
+
+
+class Geofences:
+    def __init__(self, fences):
+        self.fences = fences
+        self.names = [fence["name"] for fence in fences]
+        self.fence_types = [fence["fence_type"] for fence in fences]
+        self.lat = np.array([fence["latitude"] for fence in fences], dtype=float)
+        self.lng = np.array([fence["longitude"] for fence in fences], dtype=float)
+        self.radius = np.array([fence["radius"] for fence in fences], dtype=float)
+
+        # bounding box of every circle, in degrees
+        lat_delta = self.radius / KM_PER_DEGREE
+        lng_delta = self.radius / (
+            KM_PER_DEGREE * np.maximum(np.cos(np.radians(self.lat)), 1e-6)
+        )
+        self.min_lat = self.lat - lat_delta
+        self.max_lat = self.lat + lat_delta
+        self.min_lng = self.lng - lng_delta
+        self.max_lng = self.lng + lng_delta
+
+    def __len__(self):
+        return len(self.fences)
+
+    def evaluate(self, latitudes, longitudes):
+        """
+        Returns a dict of arrays, one entry per point: inside (any fence),
+        nearest fence index and the distance to it in km.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        inside = np.zeros(len(latitudes), dtype=bool)
+        nearest = np.full(len(latitudes), -1, dtype=int)
+        distance = np.full(len(latitudes), np.inf)
+        if not len(self) or not len(latitudes):
+            return {"inside": inside, "nearest": nearest, "distance": distance}
+
+        for start in range(0, len(latitudes), POINT_CHUNK_SIZE):
+            end = start + POINT_CHUNK_SIZE
+            self._evaluate_chunk(
+                latitudes[start:end],
+                longitudes[start:end],
+                inside[start:end],
+                nearest[start:end],
+                distance[start:end],
+            )
+        return {"inside": inside, "nearest": nearest, "distance": distance}
+
+    def _evaluate_chunk(self, lat, lng, inside, nearest, distance):
+        lat_column = lat[:, None]
+        lng_column = lng[:, None]
+
+        # nearest fence from the equirectangular approximation, exact below
+        x = np.radians(lng_column - self.lng) * np.cos(
+            np.radians((lat_column + self.lat) / 2)
+        )
+        y = np.radians(lat_column - self.lat)
+        nearest[:] = np.argmin(x * x + y * y, axis=1)
+        distance[:] = haversine(lat, lng, self.lat[nearest], self.lng[nearest])
+
+        candidates = (
+            (lat_column >= self.min_lat)
+            & (lat_column <= self.max_lat)
+            & (lng_column >= self.min_lng)
+            & (lng_column <= self.max_lng)
+        )
+        point_index, fence_index = np.nonzero(candidates)
+        if len(point_index):
+            within = haversine(
+                lat[point_index],
+                lng[point_index],
+                self.lat[fence_index],
+                self.lng[fence_index],
+            ) <= self.radius[fence_index]
+            inside[np.unique(point_index[within])] = True
+
+    def get_results(self, latitudes, longitudes):
+        result = self.evaluate(latitudes, longitudes)
+        return [
+            frappe._dict(
+                latitude=flt(latitude),
+                longitude=flt(longitude),
+                inside=bool(is_inside),
+                nearest_fence=self.names[fence] if fence >= 0 else None,
+                nearest_fence_type=self.fence_types[fence] if fence >= 0 else None,
+                distance=flt(fence_distance, 3) if fence >= 0 else None,
+            )
+            for latitude, longitude, is_inside, fence, fence_distance in zip(
+                latitudes,
+                longitudes,
+                result["inside"],
+                result["nearest"],
+                result["distance"],
+            )
+        ]
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def get_fence_rows():
+    fences = []
+    for row in frappe.get_all(
+        "Office Geofencing", fields=["name", "latitude", "longitude", "radius"]
+    ):
+        fences.append(dict(row, fence_type="Office Geofencing"))
+    # Branch coordinates are Data custom fields, skip the ones not set up
+    for row in frappe.get_all(
+        "Branch", fields=["name", "latitude", "longitude", "radius"]
+    ):
+        if row.latitude and row.longitude and row.radius:
+            fences.append(
+                dict(
+                    name=row.name,
+                    latitude=flt(row.latitude),
+                    longitude=flt(row.longitude),
+                    radius=flt(row.radius),
+                    fence_type="Branch",
+                )
+            )
+    return fences
+
+
+def get_geofences(fence_type=None, name=None):
+    fences = frappe.cache().get_value(FENCE_CACHE_KEY, generator=get_fence_rows)
+    if fence_type:
+        fences = [fence for fence in fences if fence["fence_type"] == fence_type]
+    if name:
+        fences = [fence for fence in fences if fence["name"] == name]
+    return Geofences(fences)
+
+
+def clear_geofence_cache(doc=None, event=None):
+    frappe.cache().delete_value(FENCE_CACHE_KEY)
+
+
+def benchmark(points=10000, fences=500):
+    """bench execute employee_self_service.mobile.v1.geofence.benchmark"""
+    import time
+
+    rng = np.random.default_rng(0)
+    geofences = Geofences(
+        [
+            dict(
+                name=f"fence-{index}",
+                fence_type="Office Geofencing",
+                latitude=lat,
+                longitude=lng,
+                radius=radius,
+            )
+            for index, (lat, lng, radius) in enumerate(
+                zip(
+                    rng.uniform(18.8, 19.4, fences),
+                    rng.uniform(72.7, 73.1, fences),
+                    rng.uniform(0.1, 2.0, fences),
+                )
+            )
+        ]
+    )
+    latitudes = rng.uniform(18.8, 19.4, points)
+    longitudes = rng.uniform(72.7, 73.1, points)
+
+    start_time = time.perf_counter()
+    result = geofences.evaluate(latitudes, longitudes)
+    elapsed = time.perf_counter() - start_time
+    return {
+        "points": points,
+        "fences": fences,
+        "inside": int(result["inside"].sum()),
+        "seconds": round(elapsed, 4),
+    }
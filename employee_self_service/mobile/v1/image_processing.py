@@ -0,0 +1,170 @@
+import hashlib
+import io
+import os
+
+import frappe
+from PIL import Image, ImageOps
+
+"""
+Background processing of images uploaded from the app.
+
+Upload endpoints save the file as received and hand it to process_image, which
+runs on the short queue after the request is committed. The worker applies the
+EXIF orientation, downscales to IMAGE_MAX_SIZE, recompresses without EXIF (no
+GPS or device data is kept) into a new file, repoints the File to it and makes
+a THUMBNAIL_SIZE thumbnail. When the result matches an existing File by content
+hash, that file is reused instead. The uploaded file is removed from disk after
+commit once no File refers to it.
+"""
+
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "webp")
+IMAGE_MAX_SIZE = 1600
+THUMBNAIL_SIZE = 320
+JPEG_QUALITY = 82
+PROCESSED_SUFFIX = "-ess-"
+
+
+def is_image(file_url):
+    return os.path.splitext(file_url or "")[1].lower().lstrip(".") in IMAGE_EXTENSIONS
+
+
+def enqueue_image_processing(file_doc):
+    if file_doc and is_image(file_doc.file_url):
+        frappe.enqueue(
+            "employee_self_service.mobile.v1.image_processing.process_image",
+            queue="short",
+            file_name=file_doc.name,
+            enqueue_after_commit=True,
+        )
+
+
+def process_image(file_name):
+    file_doc = frappe.get_doc("File", file_name)
+    if is_processed(file_doc.file_url):
+        return
+    path = file_doc.get_full_path()
+    try:
+        content = compress_image(path)
+    except Exception:
+        # unreadable or unsupported image, keep the upload as it is
+        frappe.log_error(
+            title="ESS Image Processing Error", message=frappe.get_traceback()
+        )
+        return
+
+    content_hash = hashlib.md5(content).hexdigest()
+    uploaded_url = file_doc.file_url
+    duplicate_url = frappe.db.get_value(
+        "File",
+        {
+            "content_hash": content_hash,
+            "is_private": file_doc.is_private,
+            "name": ["!=", file_doc.name],
+        },
+        "file_url",
+    )
+    if duplicate_url:
+        # the thumbnail stays with the File that made it, thumbnails of a
+        # shared file_url are found through get_thumbnail_urls
+        file_url = duplicate_url
+    else:
+        # a new file, the uploaded one may be shared with other File rows
+        stem, extension = os.path.splitext(os.path.basename(uploaded_url))
+        file_name = f"{stem}{PROCESSED_SUFFIX}{content_hash[:10]}{extension}"
+        file_url = f"{os.path.dirname(uploaded_url)}/{file_name}"
+        processed_path = os.path.join(os.path.dirname(path), file_name)
+        # write to a temporary file first so readers never see a partial image
+        temp_path = f"{processed_path}.{frappe.generate_hash(length=8)}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, processed_path)
+
+    file_doc.db_set(
+        {
+            "file_url": file_url,
+            "thumbnail_url": None,
+            "content_hash": content_hash,
+            "file_size": len(content),
+        },
+        update_modified=False,
+    )
+    replace_file_url(file_doc, uploaded_url)
+    if not frappe.db.exists("File", {"file_url": uploaded_url}):
+        # only once the File points at the new file for good, a failure later
+        # in the job rolls the File back to the uploaded url
+        frappe.db.after_commit.add(lambda: remove_file(path))
+    if not duplicate_url:
+        file_doc.make_thumbnail(width=THUMBNAIL_SIZE, height=THUMBNAIL_SIZE)
+
+
+def remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def is_processed(file_url):
+    return PROCESSED_SUFFIX in os.path.basename(file_url or "")
+
+
+def compress_image(path):
+    """Bytes of the oriented, downscaled image, in its own format, without EXIF"""
+    with Image.open(path) as image:
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((IMAGE_MAX_SIZE, IMAGE_MAX_SIZE))
+
+        buffer = io.BytesIO()
+        if image_format == "PNG":
+            image.save(buffer, "PNG", optimize=True)
+        elif image_format == "WEBP":
+            image.save(buffer, "WEBP", quality=JPEG_QUALITY)
+        else:
+            # JPEG and MPO, the multi picture JPEG some phone cameras produce
+            image.convert("RGB").save(
+                buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+            )
+    return buffer.getvalue()
+
+
+def replace_file_url(file_doc, uploaded_url):
+    """Point the field the file is attached to at the deduplicated file"""
+    if (
+        file_doc.attached_to_doctype
+        and file_doc.attached_to_name
+        and file_doc.attached_to_field
+        and frappe.db.get_value(
+            file_doc.attached_to_doctype,
+            file_doc.attached_to_name,
+            file_doc.attached_to_field,
+        )
+        == uploaded_url
+    ):
+        frappe.db.set_value(
+            file_doc.attached_to_doctype,
+            file_doc.attached_to_name,
+            file_doc.attached_to_field,
+            file_doc.file_url,
+            update_modified=False,
+        )
+    # profile pictures are copied to the user as well
+    for user in frappe.get_all(
+        "User", filters={"user_image": uploaded_url}, pluck="name"
+    ):
+        frappe.db.set_value(
+            "User", user, "user_image", file_doc.file_url, update_modified=False
+        )
+
+
+def get_thumbnail_urls(file_urls):
+    """file_url -> thumbnail_url of the processed images among the given urls"""
+    file_urls = list({file_url for file_url in file_urls if file_url})
+    if not file_urls:
+        return {}
+    return dict(
+        frappe.get_all(
+            "File",
+            filters={"file_url": ["in", file_urls], "thumbnail_url": ["is", "set"]},
+            fields=["file_url", "thumbnail_url"],
+            as_list=1,
+        )
+    )
@@ -7,6 +7,7 @@ from employee_self_service.mobile.v1.api_utils import (
     ess_validate,
     exception_handler,
     get_employee_by_user,
+    get_list_page,
 )
 
 
@@ -34,16 +35,16 @@ def create(**data):
         
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_issue_list(start=0, page_length=10, filters=None):
+def get_issue_list(start=0, page_length=10, filters=None, cursor=None):
     try:
-        issue_list = frappe.get_list(
+        issue_list = get_list_page(
             "Issue",
             fields=[
                 "*",
             ],
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
             filters=filters,
         )
         return gen_response(200, "Issue List getting Successfully", issue_list)
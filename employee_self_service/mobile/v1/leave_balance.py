@@ -0,0 +1,168 @@
+import frappe
+from frappe.utils import flt, getdate, today
+from erpnext.accounts.utils import get_fiscal_year
+
+"""
+Leave balance snapshots per employee.
+
+Two kinds of snapshot are kept, both in one Redis hash per employee so a leave
+change drops all of them at once (see doc_events in hooks.py):
+
+- fiscal year rows in the shape of the Employee Leave Balance report, built in
+  one pass over the employee's Leave Ledger Entries and rebuilt daily, since
+  "taken" and "expired" depend on the current date
+- the balance per leave type over the allocation period a date falls in, as
+  get_leave_balance_on(consider_all_leaves_in_the_allocation_period=True)
+  computes it for the leave type picker, keyed on the date
+
+The hash expires LEAVE_BALANCE_TTL after it is created.
+"""
+
+LEAVE_BALANCE_KEY = "ess_leave_balance"
+LEAVE_BALANCE_TTL = 24 * 60 * 60
+
+
+def get_leave_balance_key(employee):
+    return f"{LEAVE_BALANCE_KEY}|{employee}"
+
+
+def get_snapshot(employee, field, build, daily=False):
+    key = get_leave_balance_key(employee)
+    cache = frappe.cache()
+    snapshot = cache.hget(key, field)
+    if not snapshot or (daily and snapshot.get("date") != today()):
+        snapshot = {"date": today(), "data": build()}
+        cache.hset(key, field, snapshot)
+        # expire the whole hash a day after it was created, so fields of past
+        # dates do not pile up while the employee has no leave change
+        redis_key = cache.make_key(key)
+        if cache.ttl(redis_key) < 0:
+            cache.expire(redis_key, LEAVE_BALANCE_TTL)
+    return snapshot["data"]
+
+
+def get_leave_balance(employee, date=None):
+    """Report rows of the fiscal year the given date falls in, one per leave type"""
+    fiscal_year = get_fiscal_year(getdate(date), as_dict=True)
+    return get_snapshot(
+        employee,
+        f"fiscal_year|{fiscal_year.name}",
+        lambda: build_leave_balance(
+            employee, fiscal_year.year_start_date, fiscal_year.year_end_date
+        ),
+        daily=True,
+    )
+
+
+def get_leave_type_balances(employee, date=None):
+    """leave_type -> balance over the allocation period the given date falls in"""
+    date = getdate(date)
+    return get_snapshot(
+        employee,
+        f"leave_type|{date}",
+        lambda: build_leave_type_balances(employee, date),
+    )
+
+
+def build_leave_type_balances(employee, date):
+    """
+    One grouped query: every leave type allocated on the date is joined to its
+    allocation period and the ledger entries within the period are summed
+    """
+    return {
+        leave_type: flt(leaves)
+        for leave_type, leaves in frappe.db.sql(
+            """SELECT entry.leave_type, SUM(entry.leaves)
+            FROM `tabLeave Ledger Entry` entry
+            INNER JOIN (
+                SELECT leave_type, MIN(from_date) AS from_date, MAX(to_date) AS to_date
+                FROM `tabLeave Ledger Entry`
+                WHERE employee = %(employee)s
+                AND transaction_type = 'Leave Allocation'
+                AND docstatus = 1
+                AND is_cancelled = 0
+                AND is_expired = 0
+                AND from_date <= %(date)s
+                AND to_date >= %(date)s
+                GROUP BY leave_type
+            ) period ON period.leave_type = entry.leave_type
+                AND entry.from_date >= period.from_date
+                AND entry.to_date <= period.to_date
+            WHERE entry.employee = %(employee)s
+            AND entry.docstatus = 1
+            AND entry.is_cancelled = 0
+            GROUP BY entry.leave_type
+            ORDER BY entry.leave_type""",
+            {"employee": employee, "date": date},
+        )
+    }
+
+
+def build_leave_balance(employee, from_date, to_date):
+    current_date = getdate(today())
+    employee_name = frappe.db.get_value("Employee", employee, "employee_name")
+    balances = {}
+    for entry in frappe.get_all(
+        "Leave Ledger Entry",
+        filters={
+            "employee": employee,
+            "docstatus": 1,
+            "is_cancelled": 0,
+            "from_date": ["<=", to_date],
+            "to_date": [">=", from_date],
+        },
+        fields=[
+            "leave_type",
+            "transaction_type",
+            "leaves",
+            "from_date",
+            "is_carry_forward",
+            "is_expired",
+        ],
+        order_by="from_date asc",
+    ):
+        row = balances.setdefault(
+            entry.leave_type,
+            frappe._dict(
+                leave_type=entry.leave_type,
+                employee=employee,
+                employee_name=employee_name,
+                opening_balance=0.0,
+                leaves_allocated=0.0,
+                leaves_taken=0.0,
+                leaves_expired=0.0,
+                closing_balance=0.0,
+            ),
+        )
+        leaves = flt(entry.leaves)
+        if entry.is_expired:
+            if getdate(entry.from_date) <= current_date:
+                row.leaves_expired -= leaves
+        elif entry.transaction_type == "Leave Allocation":
+            if entry.is_carry_forward:
+                row.opening_balance += leaves
+            else:
+                row.leaves_allocated += leaves
+        else:
+            # Leave Application and Leave Encashment entries are negative
+            if getdate(entry.from_date) <= current_date:
+                row.leaves_taken -= leaves
+
+    for row in balances.values():
+        row.closing_balance = (
+            row.opening_balance
+            + row.leaves_allocated
+            - row.leaves_taken
+            - row.leaves_expired
+        )
+    return sorted(balances.values(), key=lambda row: row.leave_type)
+
+
+def invalidate_leave_balance(employee):
+    frappe.cache().delete_value(get_leave_balance_key(employee))
+
+
+def on_leave_change(doc, event):
+    """Leave Allocation, Leave Application and Leave Ledger Entry"""
+    if doc.get("employee"):
+        invalidate_leave_balance(doc.employee)
@@ -5,9 +5,14 @@ from employee_self_service.mobile.v1.api_utils import (
     ess_validate,
     get_employee_by_user,
     exception_handler,
+    get_system_datetime,
 )
 import json
-from datetime import datetime
+from frappe.utils import now_datetime
+from employee_self_service.employee_self_service.doctype.employee_location_chunk.employee_location_chunk import (
+    append_location_points,
+)
+from employee_self_service.mobile.v1.geofence import get_geofences
 
 """save user location"""
 
@@ -47,39 +52,33 @@ def user_location(*args, **kwargs):
         if not current_employee:
             return gen_response(404, "Employee not found for current user")
 
-        # Get office geofencing settings
-        office_geofence = frappe.get_all(
-            "Office Geofencing",
-            fields=["latitude", "longitude", "radius"],
-            limit=1
-        )
-
         # Process location data
         location_data = process_location_data(data.get("location"))
-        
-        # Check if locations are within geofence if office geofence exists
-        if office_geofence:
-            geofence = office_geofence[0]
-            for coord in location_data["features"][0]["geometry"]["coordinates"]:
-                if not is_point_in_geofence(
-                    coord[1],  # latitude
-                    coord[0],  # longitude
-                    geofence.latitude,
-                    geofence.longitude,
-                    geofence.radius
-                ):
-                    frappe.log_error(
-                        f"Location outside geofence: {coord}",
-                        "Employee Location Tracking"
-                    )
+        points = get_location_points(location_data)
 
-        # Get or create Employee Location document
-        location_doc = get_or_create_location_doc(current_employee, data.get("date"))
-        
-        # Update location data
-        update_location_doc(location_doc, location_data)
-        
-        return gen_response(200, "Location updated successfully.")
+        # Evaluate the whole batch against every office and branch fence
+        geofences = get_geofences()
+        geofence_results = []
+        if geofences:
+            geofence_results = geofences.get_results(
+                [point[0] for point in points], [point[1] for point in points]
+            )
+            outside = [result for result in geofence_results if not result.inside]
+            if outside:
+                frappe.log_error(
+                    f"{len(outside)} of {len(points)} locations outside geofence: "
+                    + json.dumps(outside[:20], default=str),
+                    "Employee Location Tracking",
+                )
+
+        # Append the points as new chunks, the day's track is never reloaded
+        append_location_points(
+            current_employee.get("name"),
+            points,
+            date=data.get("date"),
+        )
+
+        return gen_response(200, "Location updated successfully.", geofence_results)
 
     except Exception as e:
         return exception_handler(e)
@@ -115,56 +114,22 @@ def process_location_data(location_data):
     except Exception as e:
         raise ValueError(f"Error processing location data: {str(e)}")
 
-def get_or_create_location_doc(employee, date):
-    """Get existing location doc or create new one"""
-    filters = {
-        "employee": employee.get("name"),
-        "date": date or frappe.utils.today()
-    }
-    
-    if frappe.db.exists("Employee Location", filters):
-        return frappe.get_doc("Employee Location", filters)
-    else:
-        return frappe.get_doc({
-            "doctype": "Employee Location",
-            "employee": employee.get("name"),
-            "date": date or frappe.utils.today()
-        })
-
-def update_location_doc(doc, location_data):
-    """Update location document with new data"""
-    try:
-        # Add timestamp to each location point
-        timestamp = datetime.now().isoformat()
-        for feature in location_data["features"]:
-            feature["properties"]["timestamp"] = timestamp
-        
-        # Update document
-        doc.location_map = json.dumps(location_data)
-        doc.save()
-        
-        # Log successful update
-        frappe.logger().info(f"Location updated for employee {doc.employee}")
-        
-    except Exception as e:
-        frappe.log_error(
-            f"Error updating location document: {str(e)}",
-            "Employee Location Update"
-        )
-        raise
-
-def is_point_in_geofence(lat, lng, center_lat, center_lng, radius):
-    """Check if a point is within the geofence"""
-    from math import sin, cos, sqrt, atan2, radians
-    
-    # Convert coordinates to radians
-    lat1, lng1, lat2, lng2 = map(radians, [lat, lng, center_lat, center_lng])
-    
-    # Calculate distance using Haversine formula
-    dlat = lat2 - lat1
-    dlng = lng2 - lng1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    distance = 6371 * c  # Earth's radius in km
-    
-    return distance <= radius
+def get_location_points(location_data):
+    """
+    Flatten GeoJSON features into [(latitude, longitude, timestamp)]. Point
+    timestamps can be sent as an ISO list in properties.timestamps, otherwise
+    the time of the request is used.
+    """
+    points = []
+    now = now_datetime()
+    for feature in location_data["features"]:
+        coordinates = feature["geometry"]["coordinates"]
+        timestamps = (feature.get("properties") or {}).get("timestamps") or []
+        for index, coord in enumerate(coordinates):
+            timestamp = (
+                get_system_datetime(timestamps[index])
+                if index < len(timestamps)
+                else now
+            )
+            points.append((coord[1], coord[0], timestamp))
+    return points
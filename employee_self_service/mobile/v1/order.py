@@ -1,6 +1,5 @@
 import json
 import frappe
-from frappe import _
 from frappe.utils import cstr, fmt_money
 
 from erpnext.accounts.utils import getdate
@@ -13,15 +12,17 @@ from employee_self_service.mobile.v1.api_utils import (
     exception_handler,
     get_actions,
     check_workflow_exists,
+    get_list_page,
 )
 from erpnext.accounts.party import get_dashboard_info
+from employee_self_service.mobile.v1.pricing import get_items_rate
 
 """order list api for mobile app"""
 
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_order_list(start=0, page_length=10, filters=None):
+def get_order_list(start=0, page_length=10, filters=None, cursor=None):
     try:
         global_defaults = get_global_defaults()
         status_field = check_workflow_exists("Sales Order")
@@ -31,7 +32,7 @@ def get_order_list(start=0, page_length=10, filters=None):
             status_val = filters.get("status")
             del filters["status"]
             filters[status_field] = status_val
-        order_list = frappe.get_list(
+        order_list = get_list_page(
             "Sales Order",
             fields=[
                 "name",
@@ -44,7 +45,7 @@ def get_order_list(start=0, page_length=10, filters=None):
             ],
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
             filters=filters,
         )
         for order in order_list:
@@ -219,46 +220,6 @@ def get_item_list(filters=None, customer=None):
         exception_handler(e)
 
 
-def get_items_rate(items, customer=None):
-    global_defaults = get_global_defaults()
-    price_list = get_default_price_list(customer=customer)
-    if not price_list:
-        frappe.throw(
-            _(
-                "Please set a price list for the customer or define a default in the Selling Settings."
-            )
-        )
-    for item in items:
-        item_price = frappe.get_all(
-            "Item Price",
-            filters={"item_code": item.name, "price_list": price_list},
-            fields=["price_list_rate"],
-        )
-        item["rate_currency"] = fmt_money(
-            item_price[0].price_list_rate if item_price else 0.0,
-            currency=global_defaults.get("default_currency"),
-        )
-        item["rate"] = item_price[0].price_list_rate if item_price else 0.0
-    return items
-
-
-def get_default_price_list(customer=None):
-    if customer:
-        price_list, customer_group = frappe.db.get_value(
-            "Customer", customer, ["default_price_list", "customer_group"]
-        )
-        if price_list:
-            return price_list
-        price_list = frappe.db.get_value(
-            "Customer Group", customer_group, "default_price_list"
-        )
-        if price_list:
-            return price_list
-    return frappe.db.get_value(
-        "Selling Settings", "Selling Settings", "selling_price_list"
-    )
-
-
 @frappe.whitelist()
 def scan_item(barcode):
     try:
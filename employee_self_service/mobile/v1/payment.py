@@ -8,6 +8,7 @@ from employee_self_service.mobile.v1.api_utils import (
     exception_handler,
     get_actions,
     check_workflow_exists,
+    get_list_page,
 )
 
 
@@ -306,7 +307,7 @@ def make_payment(*args, **kwargs):
 
 @frappe.whitelist()
 @ess_validate(methods=["POST"])
-def get_payment_entry_list(start=0, page_length=10, filters=None):
+def get_payment_entry_list(start=0, page_length=10, filters=None, cursor=None):
     try:
         status_field = check_workflow_exists("Payment Entry")
         if not status_field:
@@ -315,7 +316,7 @@ def get_payment_entry_list(start=0, page_length=10, filters=None):
             status_val = filters.get("status")
             del filters["status"]
             filters[status_field] = status_val
-        payment_entry_list = frappe.get_list(
+        payment_entry_list = get_list_page(
             "Payment Entry",
             fields=[
                 "name",
@@ -329,7 +330,7 @@ def get_payment_entry_list(start=0, page_length=10, filters=None):
             ],
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
             filters=filters,
         )
 
@@ -0,0 +1,154 @@
+import hashlib
+import os
+
+import frappe
+from frappe.utils import cint, cstr
+from employee_self_service.mobile.v1.settings import get_settings_snapshot
+
+"""
+Content addressed PDF cache for print downloads.
+
+A rendered PDF is stored under private/ess_pdf_cache, named after a hash of
+everything that affects its content: doctype, name and modified of the
+document, print format (and its modified), language and letter head. A changed
+document therefore never hits a stale file. Files are touched on every hit and
+the least recently used ones are evicted once the directory grows past
+ess_pdf_cache_max_mb (site config, 512 MB by default).
+"""
+
+PDF_CACHE_FOLDER = "ess_pdf_cache"
+DEFAULT_MAX_SIZE_MB = 512
+
+
+def get_pdf_cache_path(filename=None):
+    path = frappe.get_site_path("private", PDF_CACHE_FOLDER)
+    return os.path.join(path, filename) if filename else path
+
+
+def get_default_print_format(doctype):
+    return (
+        frappe.db.get_value(
+            "Property Setter",
+            dict(property="default_print_format", doc_type=doctype),
+            "value",
+        )
+        or "Standard"
+    )
+
+
+def get_salary_slip_print_format():
+    return get_settings_snapshot("Employee Self Service Settings").get(
+        "default_print_format"
+    ) or get_default_print_format("Salary Slip")
+
+
+def get_pdf_cache_key(doc, print_format, no_letterhead=0):
+    letter_head = ""
+    if not cint(no_letterhead):
+        letter_head = doc.get("letter_head") or frappe.db.get_value(
+            "Letter Head", {"is_default": 1}, "name"
+        )
+    print_format_modified = ""
+    if print_format and print_format != "Standard":
+        print_format_modified = frappe.db.get_value(
+            "Print Format", print_format, "modified"
+        )
+    parts = [
+        doc.doctype,
+        doc.name,
+        doc.modified,
+        print_format,
+        print_format_modified,
+        frappe.local.lang,
+        letter_head,
+    ]
+    return hashlib.sha256("|".join(cstr(part) for part in parts).encode()).hexdigest()
+
+
+def get_cached_pdf(doc, print_format=None, no_letterhead=0):
+    """PDF bytes of the document, rendered only when no cached file matches"""
+    from frappe.utils.pdf import get_pdf
+    from frappe.www.printview import validate_print_permission
+
+    print_format = print_format or get_default_print_format(doc.doctype)
+    path = get_pdf_cache_path(
+        get_pdf_cache_key(doc, print_format, no_letterhead) + ".pdf"
+    )
+    if os.path.exists(path):
+        # rendering checks print permission, a cache hit has to do it itself
+        validate_print_permission(doc)
+        os.utime(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    html = frappe.get_print(
+        doc.doctype, doc.name, print_format, doc=doc, no_letterhead=no_letterhead
+    )
+    pdf = get_pdf(html)
+    write_cached_pdf(path, pdf)
+    return pdf
+
+
+def set_pdf_response(doc, print_format=None, no_letterhead=0):
+    frappe.local.response.filename = "{name}.pdf".format(
+        name=doc.name.replace(" ", "-").replace("/", "-")
+    )
+    frappe.local.response.filecontent = get_cached_pdf(
+        doc, print_format, no_letterhead
+    )
+    frappe.local.response.type = "download"
+
+
+def write_cached_pdf(path, pdf):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write to a temporary file first so readers never see a partial PDF
+    temp_path = f"{path}.{frappe.generate_hash(length=8)}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(pdf)
+    os.replace(temp_path, path)
+    evict_pdf_cache()
+
+
+def evict_pdf_cache():
+    max_size = cint(frappe.conf.get("ess_pdf_cache_max_mb") or DEFAULT_MAX_SIZE_MB)
+    max_size *= 1024 * 1024
+    files = []
+    for entry in os.scandir(get_pdf_cache_path()):
+        if entry.is_file() and entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+
+def pre_render_salary_slip(doc, method=None):
+    """Salary Slip on_submit, opt-in through Employee Self Service Settings"""
+    if not cint(
+        get_settings_snapshot("Employee Self Service Settings").get(
+            "pre_render_salary_slip_pdf"
+        )
+    ):
+        return
+    frappe.enqueue(
+        "employee_self_service.mobile.v1.pdf_cache.render_pdf",
+        queue="long",
+        doctype=doc.doctype,
+        name=doc.name,
+        print_format=get_salary_slip_print_format(),
+        enqueue_after_commit=True,
+    )
+
+
+def render_pdf(doctype, name, print_format=None):
+    language = frappe.get_system_settings("language")
+    if language:
+        frappe.local.lang = language
+    get_cached_pdf(frappe.get_doc(doctype, name), print_format)
@@ -0,0 +1,110 @@
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import flt, fmt_money
+from employee_self_service.mobile.v1.api_utils import get_global_defaults
+
+"""
+Item rates for the mobile item pickers.
+
+All rates of a price list are loaded with one query into an index
+(item_code -> price_list_rate) kept in a Redis hash, one field per price list.
+Item Price changes drop the index of the affected price list.
+"""
+
+PRICE_INDEX_KEY = "ess_price_index"
+
+
+def get_price_index(price_list):
+    return frappe.cache().hget(
+        PRICE_INDEX_KEY, price_list, generator=lambda: build_price_index(price_list)
+    )
+
+
+def build_price_index(price_list):
+    index = {}
+    # several prices can exist for an item (uom, customer, validity), the
+    # most recently modified one wins
+    for item_code, rate in frappe.get_all(
+        "Item Price",
+        filters={"price_list": price_list},
+        fields=["item_code", "price_list_rate"],
+        order_by="modified desc",
+        as_list=1,
+    ):
+        index.setdefault(item_code, flt(rate))
+    return index
+
+
+def clear_price_index(doc, method=None):
+    price_lists = {doc.price_list}
+    doc_before_save = doc.get_doc_before_save()
+    if doc_before_save:
+        price_lists.add(doc_before_save.price_list)
+    for price_list in price_lists:
+        if price_list:
+            frappe.cache().hdel(PRICE_INDEX_KEY, price_list)
+
+
+def get_default_price_list(customer=None):
+    if customer:
+        price_list, customer_group = frappe.get_cached_value(
+            "Customer", customer, ["default_price_list", "customer_group"]
+        )
+        if price_list:
+            return price_list
+        price_list = frappe.get_cached_value(
+            "Customer Group", customer_group, "default_price_list"
+        )
+        if price_list:
+            return price_list
+    return frappe.db.get_single_value("Selling Settings", "selling_price_list")
+
+
+def get_items_rate(items, customer=None):
+    price_list = get_default_price_list(customer=customer)
+    if not price_list:
+        frappe.throw(
+            _(
+                "Please set a price list for the customer or define a default in the Selling Settings."
+            )
+        )
+    currency = get_global_defaults().get("default_currency")
+    price_index = get_price_index(price_list)
+    for item in items:
+        item["rate"] = price_index.get(item.name, 0.0)
+        item["rate_currency"] = fmt_money(item["rate"], currency=currency)
+    return items
+
+
+def benchmark(items=5000, price_list=None):
+    """bench execute employee_self_service.mobile.v1.pricing.benchmark"""
+    price_list = price_list or get_default_price_list()
+    item_codes = frappe.get_all("Item", pluck="name", page_length=items)
+
+    start_time = time.perf_counter()
+    for item_code in item_codes:
+        frappe.get_all(
+            "Item Price",
+            filters={"item_code": item_code, "price_list": price_list},
+            fields=["price_list_rate"],
+        )
+    per_item_seconds = time.perf_counter() - start_time
+
+    frappe.cache().hdel(PRICE_INDEX_KEY, price_list)
+    start_time = time.perf_counter()
+    price_index = get_price_index(price_list)
+    cold_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    price_index = get_price_index(price_list)
+    [price_index.get(item_code, 0.0) for item_code in item_codes]
+    warm_seconds = time.perf_counter() - start_time
+    return {
+        "items": len(item_codes),
+        "price_list": price_list,
+        "per_item_query_seconds": round(per_item_seconds, 4),
+        "index_cold_seconds": round(cold_seconds, 4),
+        "index_warm_seconds": round(warm_seconds, 4),
+    }
@@ -1,6 +1,5 @@
 import json
 import frappe
-from frappe import _
 from frappe.utils import cstr, fmt_money
 
 from erpnext.accounts.utils import getdate
@@ -14,21 +13,23 @@ from employee_self_service.mobile.v1.api_utils import (
     get_actions,
     check_workflow_exists,
     get_employee_by_user,
+    get_list_page,
 )
 from erpnext.accounts.party import get_dashboard_info
 
 from employee_self_service.mobile.v1.ess import download_pdf
-from employee_self_service.mobile.v1.order import get_default_price_list
+from employee_self_service.mobile.v1.pdf_cache import get_default_print_format
+from employee_self_service.mobile.v1.pricing import get_items_rate
 
 """order list api for mobile app"""
 
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_quotation_list(start=0, page_length=10, filters=None):
+def get_quotation_list(start=0, page_length=10, filters=None, cursor=None):
     try:
         global_defaults = get_global_defaults()
-        quotation_list = frappe.get_list(
+        quotation_list = get_list_page(
             "Quotation",
             fields=[
                 "name",
@@ -40,7 +41,7 @@ def get_quotation_list(start=0, page_length=10, filters=None):
             ],
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
             filters=filters,
         )
         for quotation in quotation_list:
@@ -203,29 +204,6 @@ def get_item_list(filters=None):
         exception_handler(e)
 
 
-def get_items_rate(items,customer=None):
-    global_defaults = get_global_defaults()
-    price_list = get_default_price_list(customer=customer)
-    if not price_list:
-        frappe.throw(
-            _(
-                "Please set a price list for the customer or define a default in the Selling Settings."
-            )
-        )
-    for item in items:
-        item_price = frappe.get_all(
-            "Item Price",
-            filters={"item_code": item.name, "price_list": price_list},
-            fields=["price_list_rate"],
-        )
-        item["rate_currency"] = fmt_money(
-            item_price[0].price_list_rate if item_price else 0.0,
-            currency=global_defaults.get("default_currency"),
-        )
-        item["rate"] = item_price[0].price_list_rate if item_price else 0.0
-    return items
-
-
 @frappe.whitelist()
 def scan_item(barcode):
     try:
@@ -399,14 +377,7 @@ def get_lead_list():
 def download_quotation_pdf(id):
     try:
         quotation_doc = frappe.get_doc("Quotation", id)
-        default_print_format = (
-            frappe.db.get_value(
-                "Property Setter",
-                dict(property="default_print_format", doc_type=quotation_doc.doctype),
-                "value",
-            )
-            or "Standard"
-        )
+        default_print_format = get_default_print_format(quotation_doc.doctype)
         download_pdf(
             quotation_doc.doctype,
             quotation_doc.name,
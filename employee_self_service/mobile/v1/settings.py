@@ -0,0 +1,104 @@
+from collections.abc import Mapping
+
+import frappe
+
+"""
+Read-only snapshots of single doctypes the mobile API reads on every request
+(Employee Self Service Settings, Global Defaults).
+
+A snapshot is kept in worker memory per site and in Redis (for SNAPSHOT_TTL).
+Saving the settings stamps a new version in Redis once committed; every read
+compares the stamp of its in-memory copy with it, so a worker rebuilds from
+Redis (or the database) only after a save.
+"""
+
+SNAPSHOT_KEY = "ess_settings_snapshot"
+VERSION_KEY = "ess_settings_version"
+SNAPSHOT_TTL = 6 * 60 * 60
+
+# (site, doctype) -> (version, SettingsSnapshot)
+_snapshots = {}
+
+
+class SettingsSnapshot(Mapping):
+    """Immutable mapping with attribute access, child tables become tuples"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        object.__setattr__(
+            self,
+            "_data",
+            {
+                key: tuple(SettingsSnapshot(row) for row in value)
+                if isinstance(value, list)
+                else value
+                for key, value in data.items()
+            },
+        )
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getattr__(self, key):
+        try:
+            return self._data[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Settings snapshots are read-only")
+
+    def __repr__(self):
+        return f"SettingsSnapshot({self._data!r})"
+
+
+def get_settings_snapshot(doctype):
+    cache = frappe.cache()
+    version = cache.get_value(f"{VERSION_KEY}|{doctype}")
+    local_key = (frappe.local.site, doctype)
+    local_snapshot = _snapshots.get(local_key)
+    if version and local_snapshot and local_snapshot[0] == version:
+        return local_snapshot[1]
+
+    cached = cache.get_value(f"{SNAPSHOT_KEY}|{doctype}")
+    if not version or not cached or cached["version"] != version:
+        if not version:
+            version = stamp_settings_version(doctype)
+        cached = {
+            "version": version,
+            "data": frappe.get_doc(doctype, doctype).as_dict(no_default_fields=True),
+        }
+        cache.set_value(
+            f"{SNAPSHOT_KEY}|{doctype}", cached, expires_in_sec=SNAPSHOT_TTL
+        )
+
+    snapshot = SettingsSnapshot(cached["data"])
+    _snapshots[local_key] = (version, snapshot)
+    return snapshot
+
+
+def stamp_settings_version(doctype):
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(f"{VERSION_KEY}|{doctype}", version)
+    return version
+
+
+def clear_settings_snapshot(doc, method=None):
+    """
+    on_update of the cached single doctypes. The version is stamped after
+    commit, so a reader rebuilding in between cannot cache the old row under it.
+    """
+    doctype = doc.doctype
+
+    def clear():
+        frappe.cache().delete_value(f"{SNAPSHOT_KEY}|{doctype}")
+        stamp_settings_version(doctype)
+
+    frappe.db.after_commit.add(clear)
@@ -0,0 +1,226 @@
+import hashlib
+
+import frappe
+from frappe.utils import cstr, flt, fmt_money, getdate
+
+"""
+Party statement engine for get_transactions.
+
+GL Entries of the parties are read straight from the table with an unbuffered
+cursor; the running balance and totals are computed and each row formatted in
+the same pass. Statements are
+cached by (company, party, range, latest GL Entry modified), so any new or
+cancelled entry of the parties produces a new key. Ranges longer than
+STATEMENT_SYNC_DAYS are built by a background job; the caller gets a job id
+and polls get_statement_job until the cached result is ready.
+"""
+
+STATEMENT_KEY = "ess_statement"
+STATEMENT_JOB_KEY = "ess_statement_job"
+STATEMENT_TTL = 24 * 60 * 60
+STATEMENT_SYNC_DAYS = 366
+
+
+def get_statement_key(company, party_type, parties, from_date, to_date):
+    latest_modified = frappe.db.sql(
+        """SELECT MAX(modified)
+        FROM `tabGL Entry`
+        WHERE company = %(company)s
+        AND party_type = %(party_type)s
+        AND party IN %(parties)s""",
+        {"company": company, "party_type": party_type, "parties": parties},
+    )[0][0]
+    return "|".join(
+        [
+            STATEMENT_KEY,
+            cstr(company),
+            cstr(party_type),
+            ",".join(sorted(parties)),
+            cstr(from_date),
+            cstr(to_date),
+            cstr(latest_modified),
+        ]
+    )
+
+
+def get_cached_statement(statement_key):
+    return frappe.cache().get_value(statement_key)
+
+
+def get_statement(
+    company, party_type, parties, from_date, to_date, currency, filters=None
+):
+    """
+    Formatted statement rows (opening, entries, total) and None, or None and
+    the id of the background job building them for large uncached ranges
+    """
+    statement_key = get_statement_key(company, party_type, parties, from_date, to_date)
+    statement = get_cached_statement(statement_key)
+    if statement is not None:
+        return statement, None
+    if is_large_range(from_date, to_date):
+        return None, enqueue_statement(
+            statement_key,
+            filters,
+            company=company,
+            party_type=party_type,
+            parties=parties,
+            from_date=from_date,
+            to_date=to_date,
+            currency=currency,
+        )
+    statement = build_and_cache_statement(
+        statement_key, company, party_type, parties, from_date, to_date, currency
+    )
+    return statement, None
+
+
+def build_and_cache_statement(
+    statement_key, company, party_type, parties, from_date, to_date, currency
+):
+    statement = build_statement(
+        company, party_type, parties, from_date, to_date, currency
+    )
+    frappe.cache().set_value(statement_key, statement, expires_in_sec=STATEMENT_TTL)
+    return statement
+
+
+def build_statement(company, party_type, parties, from_date, to_date, currency):
+    """
+    Rows in the shape the app and the statement print template expect. Entries
+    are formatted as they stream from the cursor, GL Entry rows are not kept.
+    """
+
+    def money(value):
+        return fmt_money(value, currency=currency)
+
+    values = {
+        "company": company,
+        "party_type": party_type,
+        "parties": parties,
+        "from_date": getdate(from_date),
+        "to_date": getdate(to_date),
+    }
+    opening = frappe.db.sql(
+        """SELECT IFNULL(SUM(debit), 0) AS debit,
+        IFNULL(SUM(credit), 0) AS credit
+        FROM `tabGL Entry`
+        WHERE company = %(company)s
+        AND party_type = %(party_type)s
+        AND party IN %(parties)s
+        AND is_cancelled = 0
+        AND (posting_date < %(from_date)s
+            OR (is_opening = 'Yes' AND posting_date <= %(to_date)s))""",
+        values,
+        as_dict=1,
+    )[0]
+    balance = flt(opening.debit) - flt(opening.credit)
+    total_debit, total_credit = flt(opening.debit), flt(opening.credit)
+    data = [
+        {
+            "account": "Opening",
+            "posting_date": getdate(from_date).strftime("%d-%m-%Y"),
+            "debit": money(opening.debit),
+            "credit": money(opening.credit),
+            "balance": money(balance),
+        }
+    ]
+
+    with frappe.db.unbuffered_cursor():
+        for row in frappe.db.sql(
+            """SELECT posting_date, voucher_type, voucher_no,
+            debit, credit, party_type, party
+            FROM `tabGL Entry`
+            WHERE company = %(company)s
+            AND party_type = %(party_type)s
+            AND party IN %(parties)s
+            AND is_cancelled = 0
+            AND is_opening != 'Yes'
+            AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+            ORDER BY posting_date, creation""",
+            values,
+            as_dict=1,
+            as_iterator=True,
+        ):
+            balance += flt(row.debit) - flt(row.credit)
+            total_debit += flt(row.debit)
+            total_credit += flt(row.credit)
+            data.append(
+                {
+                    "posting_date": row.posting_date.strftime("%d-%m-%Y"),
+                    "voucher_type": row.voucher_type,
+                    "voucher_no": row.voucher_no,
+                    "debit": money(row.debit),
+                    "credit": money(row.credit),
+                    "balance": money(balance),
+                    "party_type": row.party_type,
+                    "party": row.party,
+                }
+            )
+
+    data.append(
+        {
+            "account": "Total",
+            "posting_date": getdate(to_date).strftime("%d-%m-%Y"),
+            "debit": money(total_debit),
+            "credit": money(total_credit),
+            "balance": money(balance),
+        }
+    )
+    return data
+
+
+def is_large_range(from_date, to_date):
+    return (getdate(to_date) - getdate(from_date)).days > STATEMENT_SYNC_DAYS
+
+
+def enqueue_statement(statement_key, filters, **statement_args):
+    # per user, get_statement_job only returns jobs of the requesting user
+    job_id = hashlib.sha1(
+        f"{statement_key}|{frappe.session.user}".encode()
+    ).hexdigest()[:16]
+    job_key = f"{STATEMENT_JOB_KEY}|{job_id}"
+    job = frappe.cache().get_value(job_key)
+    if not job or job.get("status") == "Failed":
+        frappe.cache().set_value(
+            job_key,
+            {
+                "status": "Queued",
+                "statement_key": statement_key,
+                "user": frappe.session.user,
+                "filters": filters,
+            },
+            expires_in_sec=STATEMENT_TTL,
+        )
+        frappe.enqueue(
+            "employee_self_service.mobile.v1.statement.build_statement_job",
+            queue="long",
+            statement_job_id=job_id,
+            statement_key=statement_key,
+            **statement_args,
+        )
+    return job_id
+
+
+def build_statement_job(statement_job_id, statement_key, **statement_args):
+    job_key = f"{STATEMENT_JOB_KEY}|{statement_job_id}"
+    job = frappe.cache().get_value(job_key) or {}
+    try:
+        build_and_cache_statement(statement_key, **statement_args)
+        job["status"] = "Completed"
+    except Exception:
+        frappe.log_error(
+            title="ESS Statement Job Error", message=frappe.get_traceback()
+        )
+        job["status"] = "Failed"
+    frappe.cache().set_value(job_key, job, expires_in_sec=STATEMENT_TTL)
+
+
+def get_statement_job(job_id):
+    """Job status and, once completed, the cached statement rows"""
+    job = frappe.cache().get_value(f"{STATEMENT_JOB_KEY}|{job_id}")
+    if not job or job.get("user") != frappe.session.user:
+        return None
+    if job["status"] == "Completed":
+        job["data"] = get_cached_statement(job["statement_key"])
+    return job
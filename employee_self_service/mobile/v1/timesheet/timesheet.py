@@ -2,11 +2,14 @@ import frappe
 import json
 from frappe import _
 # from frappe.utils import pretty_date, getdate, fmt_money
+from frappe.utils import cint
 from employee_self_service.mobile.v1.api_utils import (
     gen_response,
     ess_validate,
     exception_handler,
     get_employee_by_user,
+    get_list_page,
+    get_ess_settings,
 )
 
 
@@ -26,8 +29,8 @@ def create_timesheet(**data):
         timesheet_doc.update(data)
         timesheet_doc.employee = emp_data.name
         timesheet_doc.company = emp_data.company
-        timesheet_submit = frappe.db.get_value("Employee Self Service Settings","Employee Self Service Settings","submit_timesheet")
-        if timesheet_submit == 1:
+        timesheet_submit = get_ess_settings().get("submit_timesheet")
+        if cint(timesheet_submit) == 1:
             timesheet_doc.submit()
         else:
             timesheet_doc.save()
@@ -39,16 +42,16 @@ def create_timesheet(**data):
         
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_timesheet_list(start=0, page_length=10, filters=None):
+def get_timesheet_list(start=0, page_length=10, filters=None, cursor=None):
     try:
-        timesheet_list = frappe.get_list(
+        timesheet_list = get_list_page(
             "Timesheet",
             fields=[
                 "*",
             ],
             start=start,
             page_length=page_length,
-            order_by="modified desc",
+            cursor=cursor,
             filters=filters,
         )
         return gen_response(200, "Timesheet List getting Successfully", timesheet_list)
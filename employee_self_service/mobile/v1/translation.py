@@ -1,12 +1,18 @@
+import json
+
 import frappe
 from frappe import _
+from frappe.utils import cint, get_datetime
 from employee_self_service.mobile.v1.api_utils import (
     gen_response,
     ess_validate,
     get_ess_settings,
     exception_handler,
+    set_etag,
 )
 
+TRANSLATION_BUNDLE_KEY = "ess_translation_bundle"
+
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
@@ -29,35 +35,92 @@ def get_ess_language():
 
 @frappe.whitelist()
 @ess_validate(methods=["GET"])
-def get_translation(language):
+def get_translation(language, since_version=None):
     try:
         if not language:
             return gen_response(500, "Language is required.")
 
-        ess_language_data = frappe.get_value(
-            "ESS Language",
-            {"language": language},
-            ["language"],
-            as_dict=1,
-        )
-        if not ess_language_data:
+        bundle = get_translation_bundle(language)
+        if not bundle:
             return gen_response(500, "Invalid Language.")
-        translation_doc = frappe.get_all(
-            "Ess Translation",
-            filters={"language": language},
-            fields=["source_text", "translated_text"],
-        )
-        translation_data = {}
-        for translation in translation_doc:
-            translation_data[translation.get("source_text")] = translation.get(
-                "translated_text"
-            ) or translation.get("source_text")
-        return gen_response(
-            200,
-            "Translation retrieved successfully",
-            {
-                "translation_data": translation_data,
+        if set_etag(language, bundle["version"], since_version):
+            return gen_response(304, "Translation not modified")
+
+        since_version = cint(since_version)
+        if since_version > bundle["version"]:
+            # unknown version, e.g. from before a restore, resend everything
+            since_version = 0
+        data = {
+            "version": bundle["version"],
+            "delta": bool(since_version),
+            "translation_data": {
+                source_text: translated_text
+                for source_text, (translated_text, version) in bundle["entries"].items()
+                if version > since_version
             },
-        )
+            # a full bundle replaces the local dictionary, no tombstones needed
+            "deleted": [
+                source_text
+                for source_text, version in bundle["deleted"].items()
+                if since_version and version > since_version
+            ],
+        }
+        return gen_response(200, "Translation retrieved successfully", data)
     except Exception as e:
         return exception_handler(e)
+
+
+def get_version(timestamp):
+    return cint(get_datetime(timestamp).strftime("%Y%m%d%H%M%S%f"))
+
+
+def get_translation_bundle(language):
+    """
+    Compiled translations of a language: {version, entries, deleted}. Every
+    entry carries the version it last changed in, so deltas are served from
+    the cached bundle without touching the database.
+    """
+    return frappe.cache().hget(
+        TRANSLATION_BUNDLE_KEY,
+        language,
+        generator=lambda: build_translation_bundle(language),
+    )
+
+
+def build_translation_bundle(language):
+    if not frappe.db.exists("ESS Language", {"language": language}):
+        return None
+
+    entries = {}
+    for source_text, translated_text, modified in frappe.get_all(
+        "Ess Translation",
+        filters={"language": language},
+        fields=["source_text", "translated_text", "modified"],
+        as_list=1,
+    ):
+        entries[source_text] = (translated_text or source_text, get_version(modified))
+
+    deleted = {}
+    for data, creation in frappe.get_all(
+        "Deleted Document",
+        filters={"deleted_doctype": "Ess Translation"},
+        fields=["data", "creation"],
+        as_list=1,
+    ):
+        translation = json.loads(data)
+        source_text = translation.get("source_text")
+        if translation.get("language") == language and source_text not in entries:
+            deleted[source_text] = get_version(creation)
+
+    return {
+        "version": max(
+            [version for _, version in entries.values()] + list(deleted.values()),
+            default=0,
+        ),
+        "entries": entries,
+        "deleted": deleted,
+    }
+
+
+def clear_translation_bundle(language):
+    frappe.cache().hdel(TRANSLATION_BUNDLE_KEY, language)
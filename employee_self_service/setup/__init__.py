@@ -3,11 +3,15 @@ from frappe.custom.doctype.custom_field.custom_field import (
     create_custom_fields as _create_custom_fields,
 )
 from employee_self_service.constants.custom_fields import CUSTOM_FIELDS
+from employee_self_service.mobile.v1.employee_events import backfill_event_month_days
 
 
 def after_install():
     create_custom_fields()
+    add_checkin_client_id_constraint()
     add_default_language_in_ess_settings()
+    build_pending_approval_index()
+    backfill_event_month_days()
 
 def create_custom_fields():
     print("Creating custom fields")
@@ -15,6 +19,15 @@ def create_custom_fields():
     print("Custom fields added")
 
 
+def add_checkin_client_id_constraint():
+    # client ids are generated on the device, so they are unique per employee
+    frappe.db.add_unique(
+        "Employee Checkin",
+        ["employee", "ess_client_id"],
+        constraint_name="ess_employee_client_id",
+    )
+
+
 def get_all_custom_fields():
     result = {}
 
@@ -37,3 +50,11 @@ def add_default_language_in_ess_settings():
                 "ess_language", dict(language="en", language_name="English")
             )
             ess_settings.save(ignore_permissions=True)
+
+
+def build_pending_approval_index():
+    if not frappe.db.count("ESS Pending Approval"):
+        frappe.enqueue(
+            "employee_self_service.employee_self_service.doctype.ess_pending_approval.ess_pending_approval.rebuild_pending_approval_index",
+            queue="long",
+        )